@@ -3,11 +3,53 @@ Agent Communication System
 Enables seamless data sharing and coordination between agents in sequential workflows
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, TypedDict
+from dataclasses import dataclass, field
+from contextvars import ContextVar
 import json
 import re
 from datetime import datetime
 
+
+# Set by SocialMediaManagerGraph.run_stream for the duration of a run: agents that can stream
+# their LLM output push text chunks onto this asyncio.Queue as they arrive
+STREAM_SINK: ContextVar[Optional[Any]] = ContextVar("stream_sink", default=None)
+
+
+class AgentResponse(TypedDict):
+    """
+    Entry in state['agent_responses']. Agents may add their own extra keys (timestamp,
+    image_url, ...), so this stays a plain dict at runtime rather than a fixed-layout object.
+    """
+    agent: str
+    action: str
+    result: Any
+
+
+@dataclass(slots=True)
+class TurnCtx:
+    """
+    Hot per-turn fields read once from the graph state so agents avoid chained .get() lookups
+    """
+    user_request: str = ""
+    session_id: str = ""
+    session_context: Dict[str, Any] = field(default_factory=dict)
+    conversation_history: List[Dict[str, Any]] = field(default_factory=list)
+    user_preferences: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "TurnCtx":
+        """Build the turn context from a graph state dict"""
+        session_context = state.get('session_context') or {}
+        return cls(
+            user_request=state.get('user_request', ''),
+            session_id=state.get('session_id', ''),
+            session_context=session_context,
+            conversation_history=session_context.get('conversation_history', []),
+            user_preferences=session_context.get('user_preferences', {})
+        )
+
+
 class AgentCommunication:
     """
     Universal communication system for agent-to-agent data sharing
@@ -265,6 +307,22 @@ class AgentCommunication:
         
         return current_agent in data_dependent_agents
     
+    @staticmethod
+    def record_agent_response(state: Dict[str, Any], payload: AgentResponse) -> bool:
+        """Append an agent response once per agent, tracking responders in a set for O(1) checks"""
+        responses = state.setdefault('agent_responses', [])
+        responded = state.get('_responded_agents')
+        if responded is None:
+            # Seed from the list in case the set was not carried across graph nodes
+            responded = state['_responded_agents'] = {r.get('agent') for r in responses}
+
+        agent = payload['agent']
+        if agent in responded:
+            return False
+        responded.add(agent)
+        responses.append(payload)
+        return True
+
     @staticmethod
     def add_communication_metadata(state: Dict[str, Any], current_agent: str, used_previous_data: bool = False):
         """Add metadata about agent communication to state"""
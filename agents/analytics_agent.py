@@ -13,39 +13,21 @@ import threading
 import time
 from groq import Groq
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 from api.services.instagram_service import InstagramService
+from agents.agent_communication import AgentCommunication
 
 class AnalyticsAgent:
     """
     Enhanced Analytics Agent with continuous data feeding and LLM integration
     """
     
-    def __init__(self, groq_api_key: str = None):
-        print("🔍 Initializing Enhanced Analytics Agent with LLM")
-        self.name = "analytics"
-        self.description = "AI Analytics Specialist with Cached Data"
-        
-        # Initialize services
-        self.groq_api_key = groq_api_key or os.getenv("GROQ_API_KEY")
-        if not self.groq_api_key:
-            raise ValueError("GROQ_API_KEY required for analytics agent")
-        
-        self.groq_client = Groq(api_key=self.groq_api_key)
-        
-        try:
-            self.instagram_service = InstagramService()
-            print("✅ Instagram Analytics Service Connected")
-        except Exception as e:
-            print(f"⚠️ Instagram Service Error: {e}")
-            self.instagram_service = None
-        
-        # Use cached data instead of continuous updates
-        self.cached_data = {}
-        self.data_loaded = False
-        
-        # System prompt for the LLM
-        self.system_prompt = """You are an expert Instagram analytics specialist with access to real-time data. 
+    __slots__ = ("name", "description", "groq_api_key", "groq_client", "instagram_service", "cached_data", "data_loaded", "_data_lock")
+
+    # System prompt for the LLM
+    system_prompt = """You are an expert Instagram analytics specialist with access to real-time data. 
 
 Your personality:
 - Conversational and friendly, like talking to a knowledgeable friend
@@ -70,12 +52,45 @@ When responding:
 
 Current data context will be provided with each conversation."""
 
+    def __init__(self, groq_api_key: str = None):
+        print("🔍 Initializing Enhanced Analytics Agent with LLM")
+        self.name = "analytics"
+        self.description = "AI Analytics Specialist with Cached Data"
+        
+        # Initialize services
+        self.groq_api_key = groq_api_key or os.getenv("GROQ_API_KEY")
+        if not self.groq_api_key:
+            raise ValueError("GROQ_API_KEY required for analytics agent")
+        
+        self.groq_client = Groq(api_key=self.groq_api_key)
+        
+        try:
+            self.instagram_service = InstagramService()
+            print("✅ Instagram Analytics Service Connected")
+        except Exception as e:
+            print(f"⚠️ Instagram Service Error: {e}")
+            self.instagram_service = None
+        
+        # Use cached data instead of continuous updates
+        self.cached_data = {}
+        self.data_loaded = False
+        self._data_lock = threading.Lock()
+
     def get_cached_data(self):
         """Get data from cache - only fetch once per session"""
         if self.data_loaded and self.cached_data:
             print("📋 Using cached analytics data")
             return self.cached_data
-            
+
+        # Graph runs call in from several threads; one loads the data and the others reuse it
+        with self._data_lock:
+            if self.data_loaded and self.cached_data:
+                print("📋 Using cached analytics data")
+                return self.cached_data
+            return self._load_data()
+
+    def _load_data(self):
+        """Fetch account and post data and rebuild the analytics summary"""
         try:
             print("🔄 Loading analytics data for first time...")
             # Fetch data once when needed, not continuously
@@ -230,18 +245,12 @@ Current data context will be provided with each conversation."""
 
     def _add_agent_response(self, state: Dict[str, Any], action: str, result: str):
         """Add agent response to state"""
-        if 'agent_responses' not in state:
-            state['agent_responses'] = []
-        
-        # Check if response already exists to prevent duplicates
-        existing = [r for r in state['agent_responses'] if r.get('agent') == self.name and r.get('action') == action]
-        if not existing:
-            state['agent_responses'].append({
-                'agent': self.name,
-                'action': action,
-                'result': result,
-                'timestamp': datetime.now().isoformat()
-            })
+        AgentCommunication.record_agent_response(state, {
+            'agent': self.name,
+            'action': action,
+            'result': result,
+            'timestamp': datetime.now().isoformat()
+        })
 
     def get_current_data_summary(self) -> Dict[str, Any]:
         """Get current data summary for external use"""
@@ -253,6 +262,7 @@ Current data context will be provided with each conversation."""
     
     def refresh_cache(self):
         """Force refresh of cached data"""
-        self.data_loaded = False
-        self.cached_data = {}
-        return self.get_cached_data()
\ No newline at end of file
+        with self._data_lock:
+            self.data_loaded = False
+            self.cached_data = {}
+            return self._load_data()
\ No newline at end of file
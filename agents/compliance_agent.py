@@ -5,10 +5,14 @@ Handles brand safety, content moderation, and legal compliance
 
 from typing import Dict, Any
 
+from agents.agent_communication import AgentCommunication
+
 class ComplianceAgent:
     """
     Compliance agent for ensuring brand safety and legal compliance
     """
+
+    __slots__ = ("name",)
     
     def __init__(self):
         print("Initializing Compliance Agent")
@@ -33,7 +37,7 @@ class ComplianceAgent:
             'risk_level': 'low'
         }
         
-        state['agent_responses'].append({
+        AgentCommunication.record_agent_response(state, {
             'agent': self.name,
             'action': 'compliance_check',
             'result': 'Compliance check completed',
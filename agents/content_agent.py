@@ -17,7 +17,7 @@ load_dotenv()
 from session_memory import get_session_memory_manager
 
 # Import agent communication system
-from agents.agent_communication import AgentCommunication, AgentCoordinator
+from agents.agent_communication import AgentCommunication, AgentCoordinator, TurnCtx
 
 
 class ContentAgent:
@@ -25,6 +25,30 @@ class ContentAgent:
     Content agent with simplified reflection architecture
     """
 
+    __slots__ = ("name", "client", "model", "max_reflections", "openrouter_api_key", "image_model", "session_memory")
+
+    # Content creation system prompt
+    system_prompt = """You are an expert social media content creator specializing in Instagram and TikTok content.
+You create engaging, platform-optimized content that drives engagement and growth.
+
+Your expertise includes:
+- Creating viral reel concepts and hooks
+- Writing compelling captions with CTAs
+- Optimizing content for Instagram/TikTok algorithms
+- Understanding audience psychology and engagement patterns
+- Crafting content series and thematic campaigns
+- Using trending formats and audio effectively
+- Use emojis to make the content more lively and engaging
+
+
+Focus on:
+- High-engagement hooks in the first 3 seconds
+- Clear value proposition and storytelling
+- Strong call-to-actions that drive comments/shares
+- Platform-specific formatting and best practices
+- Hashtag strategies for discoverability
+- Content that encourages saves and shares"""
+
     def __init__(self):
         print("Initializing Content Agent")
         self.name = "content"
@@ -48,28 +72,6 @@ class ContentAgent:
         # Session memory manager
         self.session_memory = get_session_memory_manager()
 
-        # Content creation system prompt
-        self.system_prompt = """You are an expert social media content creator specializing in Instagram and TikTok content.
-You create engaging, platform-optimized content that drives engagement and growth.
-
-Your expertise includes:
-- Creating viral reel concepts and hooks
-- Writing compelling captions with CTAs
-- Optimizing content for Instagram/TikTok algorithms
-- Understanding audience psychology and engagement patterns
-- Crafting content series and thematic campaigns
-- Using trending formats and audio effectively
-- Use emojis to make the content more lively and engaging
-
-
-Focus on:
-- High-engagement hooks in the first 3 seconds
-- Clear value proposition and storytelling
-- Strong call-to-actions that drive comments/shares
-- Platform-specific formatting and best practices
-- Hashtag strategies for discoverability
-- Content that encourages saves and shares"""
-
     def _call_llm(self, system_prompt: str, user_prompt: str, temperature: float = 0.5) -> str:
         """Simplified LLM call method"""
         if not self.client:
@@ -351,12 +353,11 @@ Remember: Your response should be a direct answer to the user's request, nothing
         """
         Enhanced content creation with strategy, analytics, and session memory integration
         """
-        print(f"Content Agent processing: {state.get('user_request', '')}")
+        turn = TurnCtx.from_state(state)
+        user_request = turn.user_request
+        print(f"Content Agent processing: {user_request}")
         state["current_agent"] = self.name
 
-        user_request = state.get('user_request', '')
-        session_id = state.get('session_id', '')
-
         # Get previous agent insights using communication system
         agent_context = AgentCoordinator.prepare_agent_context(state, self.name)
         strategy_data = agent_context.get('strategy_recommendations', {})
@@ -368,9 +369,8 @@ Remember: Your response should be a direct answer to the user's request, nothing
             print(f"[CONTENT] Using analytics data: best_theme={analytics_data.get('top_theme', 'N/A')}")
 
         # Get session context for personalization
-        session_context = state.get('session_context', {})
-        conversation_history = session_context.get('conversation_history', [])
-        user_preferences = session_context.get('user_preferences', {})
+        session_context = turn.session_context
+        conversation_history = turn.conversation_history
 
         print(f"[CONTENT] Session context: {len(conversation_history)} previous interactions")
 
@@ -459,7 +459,7 @@ Remember: Your response should be a direct answer to the user's request, nothing
         state['generated_content'] = result
 
         # Update session memory with this agent response
-        if session_id:
+        if turn.session_id:
             metadata = {
                 'reflection_count': 2,
                 'has_image': bool(image_url),
@@ -470,8 +470,7 @@ Remember: Your response should be a direct answer to the user's request, nothing
             # Note: The graph_setup.py will handle updating session memory with the final response
 
         # Add agent response only once
-        existing_responses = [r for r in state.get('agent_responses', []) if r.get('agent') == self.name]
-        if not existing_responses:
+        if self.name not in state.get('_responded_agents', ()):
             response_text = 'Multi-platform content created successfully'
             if strategy_data:
                 response_text += ' (based on strategy recommendations)'
@@ -482,7 +481,7 @@ Remember: Your response should be a direct answer to the user's request, nothing
             if image_url:
                 response_text += ' (with generated image)'
 
-            state['agent_responses'].append({
+            AgentCommunication.record_agent_response(state, {
                 'agent': self.name,
                 'action': 'content_creation',
                 'result': response_text,
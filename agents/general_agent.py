@@ -17,32 +17,10 @@ load_dotenv()
 from session_memory import get_session_memory_manager
 
 # Import agent communication system
-from agents.agent_communication import AgentCommunication, AgentCoordinator
+from agents.agent_communication import AgentCommunication, AgentCoordinator, TurnCtx
 
-
-class GeneralAgent:
-    """
-    General conversational AI agent with ChatGPT-like capabilities and session memory
-    """
-
-    def __init__(self, groq_api_key: str = None):
-        print("[INIT] Initializing General Conversational Agent")
-        self.name = "general"
-        self.description = "General Conversational AI Assistant"
-
-        # LLM client setup
-        self.groq_api_key = groq_api_key or os.getenv("GROQ_API_KEY")
-        if not self.groq_api_key:
-            print("[WARN] GROQ_API_KEY not found - general chat will be limited")
-            self.groq_client = None
-        else:
-            self.groq_client = Groq(api_key=self.groq_api_key)
-
-        # Session memory manager for conversation context
-        self.session_memory = get_session_memory_manager()
-
-        # Conversational AI system prompt
-        self.system_prompt = """You are a helpful, intelligent, and conversational AI assistant. You engage in natural, flowing conversations while maintaining context and memory of previous interactions.
+# Conversational AI system prompt
+SYSTEM_PROMPT = """You are a helpful, intelligent, and conversational AI assistant. You engage in natural, flowing conversations while maintaining context and memory of previous interactions.
 
 Your personality:
 - Friendly and approachable, like a knowledgeable friend
@@ -72,7 +50,34 @@ Guidelines for responses:
 
 Remember: You're here to help and have a conversation, not just answer questions!"""
 
-    def _call_llm(self, system_prompt: str, user_prompt: str, temperature: float = 0.7) -> str:
+
+class GeneralAgent:
+    """
+    General conversational AI agent with ChatGPT-like capabilities and session memory
+    """
+
+    __slots__ = ("name", "description", "groq_api_key", "groq_client", "session_memory")
+
+    # Shared, byte-identical system prefix for every LLM call
+    SYSTEM_PROMPT_MESSAGES = ({"role": "system", "content": SYSTEM_PROMPT},)
+
+    def __init__(self, groq_api_key: str = None):
+        print("[INIT] Initializing General Conversational Agent")
+        self.name = "general"
+        self.description = "General Conversational AI Assistant"
+
+        # LLM client setup
+        self.groq_api_key = groq_api_key or os.getenv("GROQ_API_KEY")
+        if not self.groq_api_key:
+            print("[WARN] GROQ_API_KEY not found - general chat will be limited")
+            self.groq_client = None
+        else:
+            self.groq_client = Groq(api_key=self.groq_api_key)
+
+        # Session memory manager for conversation context
+        self.session_memory = get_session_memory_manager()
+
+    def _call_llm(self, user_prompt: str, temperature: float = 0.7) -> str:
         """Make LLM call with error handling"""
         if not self.groq_client:
             return "I'm sorry, but I'm not able to connect to my language model right now. Please check your API configuration."
@@ -81,8 +86,7 @@ Remember: You're here to help and have a conversation, not just answer questions
             print(f"Making conversational LLM call...")
             response = self.groq_client.chat.completions.create(
                 model="meta-llama/llama-4-scout-17b-16e-instruct",
-                messages=[
-                    {"role": "system", "content": system_prompt},
+                messages=list(self.SYSTEM_PROMPT_MESSAGES) + [
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=temperature,
@@ -98,10 +102,8 @@ Remember: You're here to help and have a conversation, not just answer questions
             print(f"LLM Error: {e}")
             return f"I'm experiencing some technical difficulties right now. Please try again in a moment! Error: {str(e)}"
 
-    def _build_conversation_context(self, session_context: Dict[str, Any]) -> str:
+    def _build_conversation_context(self, conversation_history: List[Dict[str, Any]]) -> str:
         """Build conversation context from session memory"""
-        conversation_history = session_context.get('conversation_history', [])
-
         if not conversation_history:
             print("[GENERAL] No conversation history found")
             return ""
@@ -143,16 +145,12 @@ Remember: You're here to help and have a conversation, not just answer questions
         Process conversational requests with session memory integration
         """
         state['current_agent'] = self.name
-        user_request = state.get('user_request', '')
-        session_id = state.get('session_id', '')
+        ctx = TurnCtx.from_state(state)
+        user_request = ctx.user_request
+        conversation_history = ctx.conversation_history
 
         print(f"[GENERAL] Conversational request: {user_request}")
-        print(f"[GENERAL] Session ID: {session_id}")
-
-        # Get session context for conversation history
-        session_context = state.get('session_context', {})
-        conversation_history = session_context.get('conversation_history', [])
-        user_preferences = session_context.get('user_preferences', {})
+        print(f"[GENERAL] Session ID: {ctx.session_id}")
 
         print(f"[GENERAL] Session context: {len(conversation_history)} previous exchanges")
         if conversation_history:
@@ -161,7 +159,7 @@ Remember: You're here to help and have a conversation, not just answer questions
             print("[GENERAL] WARNING: No conversation history found in session context!")
 
         # Build conversation context for the AI
-        conversation_context = self._build_conversation_context(session_context)
+        conversation_context = self._build_conversation_context(conversation_history)
 
         # Create conversational prompt
         if conversation_context:
@@ -177,7 +175,7 @@ This appears to be the start of our conversation. Please respond helpfully and e
 
         # Generate conversational response
         try:
-            response = self._call_llm(self.system_prompt, full_prompt, temperature=0.8)
+            response = self._call_llm(full_prompt, temperature=0.8)
         except Exception as e:
             print(f"[ERROR] General agent error: {e}")
             response = "I'm having some trouble processing your request right now. Could you try rephrasing it or asking me something else?"
@@ -191,18 +189,13 @@ This appears to be the start of our conversation. Please respond helpfully and e
         }
 
         # Add agent response
-        if 'agent_responses' not in state:
-            state['agent_responses'] = []
-
-        existing = [r for r in state['agent_responses'] if r.get('agent') == self.name]
-        if not existing:
-            state['agent_responses'].append({
-                'agent': self.name,
-                'action': 'general_conversation',
-                'result': response,
-                'timestamp': datetime.now().isoformat(),
-                'conversation_context_used': bool(conversation_history)
-            })
+        AgentCommunication.record_agent_response(state, {
+            'agent': self.name,
+            'action': 'general_conversation',
+            'result': response,
+            'timestamp': datetime.now().isoformat(),
+            'conversation_context_used': bool(conversation_history)
+        })
 
         print(f"[GENERAL] Response generated: {len(response)} characters")
         return state
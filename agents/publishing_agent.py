@@ -3,143 +3,395 @@ Publishing Agent for AI Social Media Manager
 Handles content scheduling and cross-platform publishing
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlencode
 import sys
 import os
 import json
+import re
 import uuid
+import asyncio
+import atexit
+import base64
+import binascii
+import contextlib
+import functools
+import hashlib
+import stat
+import tempfile
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Project root, added once so `api.*` resolves when agents are imported from api/
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 from api.services.instagram_service import InstagramService
+from api.services.posts_store import PostsStore
 from agents.agent_communication import AgentCommunication, AgentCoordinator
 
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+    TOOLBELT_AVAILABLE = True
+except ImportError:
+    TOOLBELT_AVAILABLE = False
+
+# Schedule-time phrases in priority order; each has exactly one capture group
+_SCHEDULE_TIME_PATTERNS = (
+    r'at (\d{1,2}\.\d{2}\s*(?:am|pm))',  # at 12.47pm
+    r'at (\d{1,2}:\d{2}\s*(?:am|pm))',  # at 8:30pm
+    r'at (\d{1,2}\s*(?:am|pm))',        # at 8pm
+    r'(\d{1,2}\.\d{2}\s*(?:am|pm))',   # 12.47pm
+    r'(\d{1,2}:\d{2}\s*(?:am|pm))',   # 8:30pm
+    r'(\d{1,2}\s*(?:am|pm))',          # 8pm
+    r'(\d{1,2}:\d{2})',               # 14:30
+    r'(tomorrow)',
+    r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)'
+)
+# Fused into one alternation so the request is scanned once; group N is pattern N
+_SCHEDULE_TIME_RE = re.compile("|".join(f"(?:{p})" for p in _SCHEDULE_TIME_PATTERNS), re.IGNORECASE)
+
+
+def extract_schedule_time(text: str) -> Optional[str]:
+    """Return the highest-priority schedule phrase in text, or None"""
+    best = None
+    for match in _SCHEDULE_TIME_RE.finditer(text):
+        if best is None or match.lastindex < best.lastindex:
+            best = match
+            if best.lastindex == 1:
+                break
+    return best.group(best.lastindex) if best else None
+
+
+# Shared pool for hedged image uploads; a per-call `with` executor would wait for the loser
+_UPLOAD_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-upload")
+# Separate pool for process()'s background upload jobs: they wait on _UPLOAD_POOL futures,
+# so sharing one pool could deadlock once every worker is a waiting job
+_BACKGROUND_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="publish-prep")
+
+# Keep-alive session shared by every PublishingAgent instance,
+# so Graph API / IMGBB calls reuse pooled TCP+TLS connections
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+_HTTP.headers.update({"Connection": "keep-alive"})
+# Release pooled sockets cleanly on interpreter exit
+atexit.register(_HTTP.close)
+
+# Serializes writes to the upload cache sidecar; background uploads and other agents share it
+_UPLOAD_CACHE_LOCK = threading.Lock()
+
+_HTTP_PREFIXES = ("http://", "https://")
+
+_DIGITS = frozenset("0123456789")
+
+_WEEKDAYS = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
+    'friday': 4, 'saturday': 5, 'sunday': 6
+}
+
+
+def scan_clock_time(text: str) -> Optional[Tuple[int, int]]:
+    """
+    Find a clock time ("8pm", "8:30 pm", "12.47am", "14:30") in one pass over lowercase text.
+    A time with minutes and am/pm wins over a bare "8pm", which wins over a 24h "14:30".
+    Returns (hour, minute) on a 24-hour clock, or None if there is no clock time.
+    Raises ValueError for an out-of-range time such as "13pm" or "25:00".
+    """
+    best_rank = 3
+    best = None
+    n = len(text)
+    i = 0
+    while i < n:
+        if text[i] not in _DIGITS:
+            i += 1
+            continue
+        start = i
+        while i < n and text[i] in _DIGITS:
+            i += 1
+        if i - start > 2:
+            continue
+        hour = int(text[start:i])
+        
+        # Optional ":MM" / ".MM"
+        minute = None
+        sep = text[i:i + 1]
+        end = i
+        if sep in (":", ".") and i + 3 <= n and text[i + 1] in _DIGITS and text[i + 2] in _DIGITS:
+            minute = int(text[i + 1:i + 3])
+            end = i + 3
+        
+        # Optional am/pm after any spaces
+        while end < n and text[end] == " ":
+            end += 1
+        meridiem = text[end:end + 2]
+        if meridiem not in ("am", "pm"):
+            meridiem = None
+        
+        if meridiem and minute is not None:
+            rank = 0
+        elif meridiem:
+            rank = 1
+        elif minute is not None and sep == ":":
+            rank = 2
+        else:
+            continue
+        
+        if rank < best_rank:
+            best_rank = rank
+            best = (hour, minute or 0, meridiem)
+            if rank == 0:
+                break
+    
+    if best is None:
+        return None
+    hour, minute, meridiem = best
+    if meridiem == "pm" and hour != 12:
+        hour += 12
+    elif meridiem == "am" and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        # Falling back to a default time would usually publish immediately; reject instead
+        raise ValueError(f"Invalid time: {best[0]}:{minute:02d}{' ' + meridiem if meridiem else ''}")
+    return hour, minute
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_natural_time(time_str: str, minute: datetime) -> datetime:
+    """
+    Resolve a lowercase phrase like "8pm", "tomorrow" or "friday" against the current minute.
+    Every result has zero seconds, so it is identical for any instant within that minute,
+    and repeated phrases are answered from the cache until the minute rolls over.
+    """
+    now = minute
+    
+    # Handle specific times like "8pm", "3:30pm", "14:00"
+    clock_time = scan_clock_time(time_str)
+    if clock_time:
+        hour, minute_of_hour = clock_time
+        target_time = now.replace(hour=hour, minute=minute_of_hour)
+        
+        # If time has passed today, schedule for tomorrow
+        if target_time <= now:
+            target_time += timedelta(days=1)
+        
+        return target_time
+    
+    # Handle day-specific scheduling
+    base_date = now
+    if 'tomorrow' in time_str:
+        base_date = now + timedelta(days=1)
+    else:
+        for day_name, weekday in _WEEKDAYS.items():
+            if day_name in time_str:
+                # Next occurrence of that weekday; today's name means a week from today
+                days_ahead = (weekday - now.weekday()) % 7 or 7
+                base_date = now + timedelta(days=days_ahead)
+                break
+    
+    # Default to 9 AM if no specific time
+    return base_date.replace(hour=9, minute=0)
+
+
+# Shared aiohttp session (keep-alive + connection pooling), created lazily on the running loop
+_aiohttp_session = None
+_aiohttp_lock = asyncio.Lock()
+
+
+async def get_aiohttp_session():
+    """Get the shared aiohttp session, creating it on first use"""
+    global _aiohttp_session
+    async with _aiohttp_lock:
+        if _aiohttp_session is None or _aiohttp_session.closed:
+            # Keep connections warm so a post's container + publish calls share one TLS handshake
+            _aiohttp_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=20, keepalive_timeout=60, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+    return _aiohttp_session
+
+
+async def close_aiohttp_session():
+    """Close the shared aiohttp session if one was opened"""
+    global _aiohttp_session
+    if _aiohttp_session is not None and not _aiohttp_session.closed:
+        await _aiohttp_session.close()
+    _aiohttp_session = None
+
+
 class PublishingAgent:
     """
     Publishing agent for scheduling and posting content
     """
+
+    __slots__ = (
+        "name", "posts_store", "instagram_service", "http",
+        "_media_path", "_publish_path", "_media_url", "_publish_url", "_base_params",
+        "_upload_cache_file", "_upload_cache"
+    )
     
     def __init__(self):
         print("Initializing Publishing Agent")
         self.name = "publishing"
-        self.posts_file = os.path.abspath("scheduled_posts.json")
+        self.posts_store = PostsStore()
+        
+        # Sidecar of content hash -> IMGBB URL so identical images are uploaded only once
+        self._upload_cache_file = os.path.splitext(self.posts_store.posts_file)[0] + ".uploads.json"
+        self._upload_cache = self._load_upload_cache()
+
+        self.http = _HTTP
+
         try:
             self.instagram_service = InstagramService()
         except Exception as e:
             print(f"Warning: Instagram service not available: {e}")
             self.instagram_service = None
         
+        # Graph API endpoints and auth are fixed for the account; build them once
+        if self.instagram_service:
+            account_id = self.instagram_service.instagram_account_id
+            self._media_path = f"{account_id}/media"
+            self._publish_path = f"{account_id}/media_publish"
+            self._media_url = self.GRAPH_API_URL + self._media_path
+            self._publish_url = self.GRAPH_API_URL + self._publish_path
+            self._base_params = {"access_token": self.instagram_service.access_token}
+        else:
+            self._media_path = self._publish_path = None
+            self._media_url = self._publish_url = None
+            self._base_params = {}
+        
     def _load_posts(self) -> list:
-        """Load posts from JSON file"""
+        """Load posts from the JSONL posts log"""
+        return self.posts_store.load_posts()
+    
+    def _save_posts(self, posts: list):
+        """Rewrite the posts log from a full list"""
+        self.posts_store.save_posts(posts)
+    
+    GRAPH_API_URL = "https://graph.facebook.com/v19.0/"
+    # The Graph API accepts at most 50 operations per batch request
+    GRAPH_BATCH_LIMIT = 50
+    
+    # Keywords that resolve to a fixed offset from now (empty = no time given)
+    SCHEDULE_OFFSETS = {
+        "": timedelta(minutes=1),
+        "now": timedelta(minutes=1),
+    }
+    
+    def _load_upload_cache(self) -> Dict[str, str]:
+        """Load the image upload cache sidecar"""
         try:
-            with open(self.posts_file, 'r') as f:
+            with open(self._upload_cache_file, 'r') as f:
                 return json.load(f)
-        except FileNotFoundError:
-            return []
+        except (OSError, ValueError):
+            return {}
     
-    def _save_posts(self, posts: list):
-        """Save posts to JSON file"""
-        with open(self.posts_file, 'w') as f:
-            json.dump(posts, f, indent=2, default=str)
+    def _remember_upload(self, digest: str, image_url: str):
+        """Record an uploaded image URL and persist the cache"""
+        with _UPLOAD_CACHE_LOCK:
+            self._upload_cache[digest] = image_url
+            snapshot = dict(self._upload_cache)
+            tmp_file = None
+            try:
+                # Unique temp file in the same directory, so the replace stays atomic
+                fd, tmp_file = tempfile.mkstemp(
+                    dir=os.path.dirname(self._upload_cache_file) or ".",
+                    prefix=os.path.basename(self._upload_cache_file) + ".", suffix=".tmp"
+                )
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp_file, self._upload_cache_file)
+            except OSError as e:
+                print(f"Could not persist upload cache: {e}")
+                if tmp_file is not None:
+                    with contextlib.suppress(OSError):
+                        os.remove(tmp_file)
     
-    def _parse_schedule_time(self, time_str: str) -> datetime:
+    @staticmethod
+    def _image_digest(image_bytes: bytes) -> str:
+        """Content hash used as the upload cache key"""
+        return hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+    
+    def _parse_schedule_time(self, time_str: str, now: Optional[datetime] = None) -> datetime:
         """Parse various time formats into datetime"""
-        if not time_str:
-            # Default to current time + 1 minute for immediate scheduling
-            return datetime.now() + timedelta(minutes=1)
-        
-        if time_str.lower() == "now":
-            # Schedule for current time + 1 minute
-            return datetime.now() + timedelta(minutes=1)
+        # Read the clock once (or use the caller's); every branch below works from the same instant
+        now = now or datetime.now()
+        raw = (time_str or "").strip()
+        time_str = raw.lower()
         
-        try:
-            # Try ISO format first
-            return datetime.fromisoformat(time_str)
-        except:
-            pass
-        
-        # Parse natural language times
-        time_str = time_str.lower().strip()
-        now = datetime.now()
-        
-        # Handle specific times like "8pm", "3:30pm", "14:00"
-        import re
-        
-        # Match patterns like "8pm", "8:30pm", "12.47pm", "20:00", "8:30 pm"
-        time_patterns = [
-            r'(\d{1,2})\.(\d{2})\s*pm',  # 12.47pm
-            r'(\d{1,2})\.(\d{2})\s*am',  # 8.30am
-            r'(\d{1,2}):(\d{2})\s*pm',  # 8:30pm
-            r'(\d{1,2}):(\d{2})\s*am',  # 8:30am
-            r'(\d{1,2})\s*pm',  # 8pm
-            r'(\d{1,2})\s*am',  # 8am
-            r'(\d{1,2}):(\d{2})',  # 14:30 (24h format)
-        ]
-        
-        for pattern in time_patterns:
-            match = re.search(pattern, time_str)
-            if match:
-                if 'pm' in time_str:
-                    hour = int(match.group(1))
-                    minute = int(match.group(2)) if len(match.groups()) > 1 else 0
-                    if hour != 12:
-                        hour += 12
-                elif 'am' in time_str:
-                    hour = int(match.group(1))
-                    minute = int(match.group(2)) if len(match.groups()) > 1 else 0
-                    if hour == 12:
-                        hour = 0
-                else:
-                    hour = int(match.group(1))
-                    minute = int(match.group(2)) if len(match.groups()) > 1 else 0
-                
-                target_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-                
-                # If time has passed today, schedule for tomorrow
-                if target_time <= now:
-                    target_time += timedelta(days=1)
-                
-                return target_time
+        # Immediate scheduling: current time + 1 minute
+        offset = self.SCHEDULE_OFFSETS.get(time_str)
+        if offset is not None:
+            return now + offset
         
-        # Handle day-specific scheduling
-        if 'tomorrow' in time_str:
-            base_date = now + timedelta(days=1)
-        elif 'monday' in time_str:
-            days_ahead = 0 - now.weekday()
-            if days_ahead <= 0:
-                days_ahead += 7
-            base_date = now + timedelta(days=days_ahead)
-        else:
-            base_date = now
+        # Only ISO timestamps start with a 4-digit year; skip the raise/catch for everything else
+        if raw[:4].isdigit():
+            try:
+                return datetime.fromisoformat(raw)
+            except ValueError:
+                pass
         
-        # Default to 9 AM if no specific time
-        return base_date.replace(hour=9, minute=0, second=0, microsecond=0)
+        # Natural-language phrases resolve to whole minutes, so they are memoized per minute
+        return _parse_natural_time(time_str, now.replace(second=0, microsecond=0))
     
     def _create_scheduled_post(self, content: str, image_url: Optional[str] = None, 
-                              schedule_time: Optional[str] = None) -> Dict:
-        """Create a scheduled post"""
-        posts = self._load_posts()
-        
-        # Parse schedule time with enhanced parsing
-        scheduled_datetime = self._parse_schedule_time(schedule_time or "now")
+                              schedule_time: Optional[str] = None,
+                              status: str = "scheduled") -> Tuple[Dict, datetime]:
+        """Create a scheduled post; returns the post and its parsed schedule time"""
+        # Parse schedule time with enhanced parsing; created_at shares the same clock reading
+        now = datetime.now()
+        scheduled_datetime = self._parse_schedule_time(schedule_time or "now", now)
         
         # Create post
         post = {
-            "id": str(uuid.uuid4()),
+            "id": uuid.uuid4().hex,
             "content": content,
             "platform": "instagram",
             "media_type": "image" if image_url else "text",
             "media_urls": [image_url] if image_url else [],
             "scheduled_time": scheduled_datetime.isoformat(),
-            "status": "scheduled",
-            "created_at": datetime.now().isoformat(),
-            "metadata": {"generated_by_ai": True}
+            # Epoch copy for the scheduler's heap/queue; the ISO string stays for display
+            "scheduled_epoch": scheduled_datetime.timestamp(),
+            "status": status,
+            "created_at": now.isoformat(),
+            "metadata": {
+                "generated_by_ai": True,
+                # Lets the scheduler publish "post now" requests ahead of later slots
+                "schedule_now": not schedule_time or schedule_time.strip().lower() == "now"
+            }
         }
         
-        posts.append(post)
-        self._save_posts(posts)
-        return post
+        # Append-only: one JSONL line instead of rewriting every post
+        self.posts_store.add_post(post)
+        return post, scheduled_datetime
     
+    @staticmethod
+    def _decode_data_uri(image_url: str) -> Optional[Tuple[bytes, str, str]]:
+        """Decode a base64 data URI into (raw bytes, mime type, upload filename)"""
+        header, sep, base64_data = image_url.partition(",")
+        if not sep:
+            print("Malformed data URI; unable to extract base64 payload")
+            return None
+        try:
+            raw = base64.b64decode(base64_data)
+        except (binascii.Error, ValueError):
+            print("Malformed data URI; base64 payload could not be decoded")
+            return None
+        mime_type = header[len("data:"):].split(";", 1)[0] or "image/png"
+        return raw, mime_type, f"image.{mime_type.rsplit('/', 1)[-1]}"
+
     def _ensure_public_image_url(self, image_url: str) -> Optional[str]:
         """Ensure we have a publicly accessible image URL.
         - If the URL is already http(s), return as-is.
@@ -149,7 +401,7 @@ class PublishingAgent:
         try:
             if not image_url:
                 return None
-            if image_url.startswith("http://") or image_url.startswith("https://"):
+            if image_url.startswith(_HTTP_PREFIXES):
                 return image_url
 
             # Handle data URI base64 case
@@ -159,30 +411,37 @@ class PublishingAgent:
                     print("No IMGBB_API_KEY set; cannot convert base64 image to public URL")
                     return None
 
-                # Extract base64 payload
-                try:
-                    base64_data = image_url.split(",", 1)[1]
-                except Exception:
-                    print("Malformed data URI; unable to extract base64 payload")
+                # Decode once and upload raw bytes (~25% smaller than the base64 text)
+                decoded = self._decode_data_uri(image_url)
+                if not decoded:
                     return None
+                raw, mime_type, filename = decoded
+                digest = self._image_digest(raw)
+                if digest in self._upload_cache:
+                    return self._upload_cache[digest]
 
                 upload_url = "https://api.imgbb.com/1/upload"
                 params = {"key": imgbb_key}
-                data = {"image": base64_data}
-                resp = requests.post(upload_url, params=params, data=data, timeout=60)
+                files = {"image": (filename, raw, mime_type)}
+                resp = self.http.post(upload_url, params=params, files=files, timeout=60)
                 if resp.status_code == 200:
                     payload = resp.json()
-                    if payload.get("success") and payload.get("data", {}).get("url"):
-                        return payload["data"]["url"]
                     # Some responses place display_url
-                    if payload.get("data", {}).get("display_url"):
-                        return payload["data"]["display_url"]
+                    data = payload.get("data", {})
+                    image_url = (payload.get("success") and data.get("url")) or data.get("display_url")
+                    if image_url:
+                        self._remember_upload(digest, image_url)
+                        return image_url
                     print(f"IMGBB upload response missing URL: {payload}")
                     return None
                 else:
                     print(f"IMGBB upload failed: {resp.status_code} - {resp.text}")
                     return None
 
+            # Local file path (e.g. a post created from a generated image on disk)
+            if os.path.isfile(image_url):
+                return self._upload_local_image(image_url)
+
             # Unknown scheme
             return None
         except Exception as e:
@@ -205,27 +464,18 @@ class PublishingAgent:
                 return {"success": False, "error": "No public image URL available for Instagram ingestion"}
 
             # Create media container
-            url = f"https://graph.facebook.com/v19.0/{self.instagram_service.instagram_account_id}/media"
-            params = {
-                "access_token": self.instagram_service.access_token,
-                "image_url": public_url,
-                "caption": post["content"]
-            }
+            params = {**self._base_params, "image_url": public_url, "caption": post["content"]}
             
-            response = requests.post(url, params=params, timeout=30)
+            response = self.http.post(self._media_url, params=params, timeout=30)
             
             if response.status_code == 200:
                 container_data = response.json()
                 container_id = container_data["id"]
                 
                 # Publish the container
-                publish_url = f"https://graph.facebook.com/v19.0/{self.instagram_service.instagram_account_id}/media_publish"
-                publish_params = {
-                    "access_token": self.instagram_service.access_token,
-                    "creation_id": container_id
-                }
+                publish_params = {**self._base_params, "creation_id": container_id}
                 
-                publish_response = requests.post(publish_url, params=publish_params, timeout=30)
+                publish_response = self.http.post(self._publish_url, params=publish_params, timeout=30)
                 
                 if publish_response.status_code == 200:
                     publish_data = publish_response.json()
@@ -238,68 +488,458 @@ class PublishingAgent:
         except Exception as e:
             return {"success": False, "error": f"Publishing error: {str(e)}"}
     
+    async def _ensure_public_image_url_async(self, image_url: str) -> Optional[str]:
+        """Async variant of _ensure_public_image_url using the shared aiohttp session"""
+        if not AIOHTTP_AVAILABLE:
+            return await asyncio.to_thread(self._ensure_public_image_url, image_url)
+
+        try:
+            if not image_url:
+                return None
+            if image_url.startswith(_HTTP_PREFIXES):
+                return image_url
+
+            # Handle data URI base64 case
+            if image_url.startswith("data:image/"):
+                imgbb_key = os.getenv("IMGBB_API_KEY")
+                if not imgbb_key:
+                    print("No IMGBB_API_KEY set; cannot convert base64 image to public URL")
+                    return None
+
+                decoded = self._decode_data_uri(image_url)
+                if not decoded:
+                    return None
+                raw, mime_type, filename = decoded
+                digest = self._image_digest(raw)
+                if digest in self._upload_cache:
+                    return self._upload_cache[digest]
+                form = aiohttp.FormData()
+                form.add_field("image", raw, filename=filename, content_type=mime_type)
+
+                session = await get_aiohttp_session()
+                async with session.post(
+                    "https://api.imgbb.com/1/upload",
+                    params={"key": imgbb_key},
+                    data=form,
+                    timeout=aiohttp.ClientTimeout(total=60)
+                ) as resp:
+                    if resp.status != 200:
+                        print(f"IMGBB upload failed: {resp.status} - {await resp.text()}")
+                        return None
+                    payload = await resp.json(content_type=None)
+
+                data = payload.get("data", {})
+                image_url = (payload.get("success") and data.get("url")) or data.get("display_url")
+                if image_url:
+                    self._remember_upload(digest, image_url)
+                    return image_url
+                print(f"IMGBB upload response missing URL: {payload}")
+                return None
+
+            if os.path.isfile(image_url):
+                return await self._upload_local_image_async(image_url)
+
+            # Unknown scheme
+            return None
+        except Exception as e:
+            print(f"Error ensuring public image URL: {e}")
+            return None
+
+    # Cap on simultaneous image uploads per post
+    UPLOAD_CONCURRENCY = 8
+
+    async def _ensure_public_urls_async(self, image_urls: List[str]) -> List[Optional[str]]:
+        """Resolve several images to public URLs concurrently, in input order"""
+        semaphore = asyncio.Semaphore(self.UPLOAD_CONCURRENCY)
+
+        async def resolve(image_url: str) -> Optional[str]:
+            async with semaphore:
+                return await self._ensure_public_image_url_async(image_url)
+
+        return await asyncio.gather(*(resolve(image_url) for image_url in image_urls))
+
+    async def _publish_to_instagram_async(self, post: Dict) -> Dict:
+        """Async variant of _publish_to_instagram; lets several posts publish concurrently"""
+        if not AIOHTTP_AVAILABLE:
+            return await asyncio.to_thread(self._publish_to_instagram, post)
+        if not self.instagram_service:
+            return {"success": False, "error": "Instagram service not available"}
+
+        try:
+            media_urls = post.get("media_urls", [])
+            if not media_urls:
+                return {"success": False, "error": "No media provided"}
+            # Carousel images upload concurrently: total time is the slowest upload, not the sum
+            public_urls = await self._ensure_public_urls_async(media_urls)
+            if not all(public_urls):
+                return {"success": False, "error": "No public image URL available for Instagram ingestion"}
+
+            session = await get_aiohttp_session()
+
+            # Create media container (a carousel wraps one child container per image)
+            if len(public_urls) == 1:
+                params = {**self._base_params, "image_url": public_urls[0], "caption": post["content"]}
+            else:
+                children = await asyncio.gather(*(
+                    self._graph_post_async(
+                        session, self._media_url,
+                        {**self._base_params, "image_url": url, "is_carousel_item": "true"}
+                    )
+                    for url in public_urls
+                ))
+                for _, error in children:
+                    if error:
+                        return {"success": False, "error": f"Carousel item creation failed: {error}"}
+                params = {
+                    **self._base_params,
+                    "media_type": "CAROUSEL",
+                    "children": ",".join(child["id"] for child, _ in children),
+                    "caption": post["content"]
+                }
+            container_data, error = await self._graph_post_async(session, self._media_url, params)
+            if error:
+                return {"success": False, "error": f"Container creation failed: {error}"}
+
+            # Publish the container over the same pooled connection
+            publish_params = {**self._base_params, "creation_id": container_data["id"]}
+            publish_data, error = await self._graph_post_async(session, self._publish_url, publish_params)
+            if error:
+                return {"success": False, "error": f"Publish failed: {error}"}
+            return {"success": True, "post_id": publish_data["id"]}
+
+        except Exception as e:
+            return {"success": False, "error": f"Publishing error: {str(e)}"}
+
+    @staticmethod
+    async def _graph_post_async(session, url: str, params: Dict) -> Tuple[Optional[Dict], Optional[str]]:
+        """POST to the Graph API; returns (json, None) on success or (None, error body)"""
+        async with session.post(url, params=params) as response:
+            if response.status != 200:
+                return None, await response.text()
+            return await response.json(content_type=None), None
+
+    async def publish_many(self, posts: List[Dict]) -> List[Dict]:
+        """Publish several posts concurrently; results are returned in input order"""
+        return await asyncio.gather(*(self._publish_to_instagram_async(post) for post in posts))
+
+    async def publish_batch_async(self, posts: List[Dict]) -> List[Dict]:
+        """
+        Publish many posts with Graph API batch requests: one round trip creates up to
+        50 containers and a second publishes them. Carousels and other posts that don't
+        have exactly one image go through the per-post path. Results keep input order.
+        """
+        if not AIOHTTP_AVAILABLE or not self.instagram_service or len(posts) < 2:
+            return await self.publish_many(posts)
+
+        results: List[Optional[Dict]] = [None] * len(posts)
+        single_image = [i for i, post in enumerate(posts) if len(post.get("media_urls") or []) == 1]
+        single_set = set(single_image)
+        others = [i for i in range(len(posts)) if i not in single_set]
+
+        async def publish_others():
+            for i, result in zip(others, await self.publish_many([posts[i] for i in others])):
+                results[i] = result
+
+        async def publish_single_image():
+            public_urls = await self._ensure_public_urls_async([posts[i]["media_urls"][0] for i in single_image])
+            ready = []
+            for i, public_url in zip(single_image, public_urls):
+                if public_url:
+                    ready.append((i, public_url))
+                else:
+                    results[i] = {"success": False, "error": "No public image URL available for Instagram ingestion"}
+
+            session = await get_aiohttp_session()
+            for start in range(0, len(ready), self.GRAPH_BATCH_LIMIT):
+                chunk = ready[start:start + self.GRAPH_BATCH_LIMIT]
+                containers = await self._graph_batch_async(session, [
+                    {"method": "POST", "relative_url": self._media_path,
+                     "body": urlencode({"image_url": public_url, "caption": posts[i]["content"]})}
+                    for i, public_url in chunk
+                ])
+
+                created = []
+                for (i, _), (container_data, error) in zip(chunk, containers):
+                    if error:
+                        results[i] = {"success": False, "error": f"Container creation failed: {error}"}
+                    else:
+                        created.append((i, container_data["id"]))
+                if not created:
+                    continue
+
+                published = await self._graph_batch_async(session, [
+                    {"method": "POST", "relative_url": self._publish_path,
+                     "body": urlencode({"creation_id": container_id})}
+                    for _, container_id in created
+                ])
+                for (i, _), (publish_data, error) in zip(created, published):
+                    if error:
+                        results[i] = {"success": False, "error": f"Publish failed: {error}"}
+                    else:
+                        results[i] = {"success": True, "post_id": publish_data["id"]}
+
+        try:
+            await asyncio.gather(publish_others(), publish_single_image())
+            error = {"success": False, "error": "No result returned for post"}
+        except Exception as e:
+            error = {"success": False, "error": f"Publishing error: {str(e)}"}
+        return [result or error for result in results]
+
+    async def _graph_batch_async(self, session, operations: List[Dict]) -> List[Tuple[Optional[Dict], Optional[str]]]:
+        """Send one Graph API batch request; returns a (json, error) pair per operation"""
+        data = {**self._base_params, "batch": json.dumps(operations)}
+        async with session.post(self.GRAPH_API_URL, data=data) as response:
+            if response.status != 200:
+                error = await response.text()
+                return [(None, error)] * len(operations)
+            replies = await response.json(content_type=None)
+
+        outcomes = []
+        for reply in replies:
+            # A null entry means the operation did not run (e.g. the batch timed out)
+            if not reply:
+                outcomes.append((None, "No response for batch operation"))
+            elif reply.get("code") != 200:
+                outcomes.append((None, reply.get("body")))
+            else:
+                outcomes.append((json.loads(reply["body"]), None))
+        return outcomes
+
     def _publish_now(self, post_id: str) -> Dict:
         """Publish a post immediately"""
-        posts = self._load_posts()
+        self.posts_store.refresh()
         
-        # Find post
-        post = None
-        for p in posts:
-            if p["id"] == post_id:
-                post = p
-                break
+        # O(1) lookup in the store's id index
+        post = self.posts_store.get_post(post_id)
         
         if not post:
             return {"success": False, "error": "Post not found"}
         
-        # Update status
+        # Interim status lives in memory only; the outcome below is the one durable write.
+        # An empty lock file marks the publish as in flight in case the process dies mid-call.
         post["status"] = "publishing"
-        self._save_posts(posts)
-        
-        # Publish
-        result = self._publish_to_instagram(post)
-        
-        # Update post with result
-        if result["success"]:
-            post["status"] = "published"
-            post["published_at"] = datetime.now().isoformat()
-            post["published_id"] = result.get("post_id")
-        else:
-            post["status"] = "failed"
-            post["error_message"] = result.get("error")
+        lock_file = self._publish_lock_file(post_id)
+        open(lock_file, 'w').close()
         
-        self._save_posts(posts)
+        try:
+            # Publish
+            result = self._publish_to_instagram(post)
+            
+            # Update post with result
+            if result["success"]:
+                changes = {
+                    "status": "published",
+                    "published_at": datetime.now().isoformat(),
+                    "published_id": result.get("post_id")
+                }
+            else:
+                changes = {"status": "failed", "error_message": result.get("error")}
+            
+            self.posts_store.update_post(post_id, changes)
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(lock_file)
         return result
     
+    def _publish_lock_file(self, post_id: str) -> str:
+        """Path of the in-flight marker for an immediate publish"""
+        return f"{self.posts_store.posts_file}.{post_id}.lock"
+    
+    def sweep_interrupted_publishes(self):
+        """
+        Mark posts whose publish (lock file left behind) or background image upload (still
+        "uploading") was cut off by a crash as failed. Call once per process at startup,
+        before anything publishes or uploads, when neither can still be running. Posts are
+        not requeued automatically, since Instagram may have accepted a publish before the crash.
+        """
+        for post in self.posts_store.load_posts():
+            if post.get("status") == "uploading":
+                print(f"Image upload for post {post['id']} was interrupted; marking it failed")
+                self.posts_store.update_post(post["id"], {
+                    "status": "failed",
+                    "error_message": "Image upload was interrupted; reschedule the post"
+                })
+
+        posts_dir = os.path.dirname(self.posts_store.posts_file)
+        prefix = os.path.basename(self.posts_store.posts_file) + "."
+        try:
+            names = os.listdir(posts_dir)
+        except OSError:
+            return
+        for name in names:
+            if not (name.startswith(prefix) and name.endswith(".lock")):
+                continue
+            post_id = name[len(prefix):-len(".lock")]
+            print(f"Publish of post {post_id} was interrupted; marking it failed")
+            self.posts_store.update_post(post_id, {
+                "status": "failed",
+                "error_message": "Publish was interrupted; check Instagram before rescheduling"
+            })
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(posts_dir, name))
+    
+    # Free API key for testing (get your own at imgbb.com)
+    LOCAL_IMGBB_UPLOAD_URL = 'https://api.imgbb.com/1/upload?key=2d1f7b0c5c8b9a1e3f4d6c8a9b2e5f7d'
+
+    @staticmethod
+    def _read_image_bytes(image_path: str) -> bytes:
+        """Read a local image in one go"""
+        with open(image_path, 'rb') as image_file:
+            return image_file.read()
+
+    def _post_multipart(self, url: str, field: str, filename: str, image_file) -> requests.Response:
+        """POST one file field, streaming the multipart body from the open file"""
+        image_file.seek(0)
+        if TOOLBELT_AVAILABLE:
+            encoder = MultipartEncoder(
+                fields={field: (filename, image_file, "application/octet-stream")}
+            )
+            return self.http.post(url, data=encoder, headers={"Content-Type": encoder.content_type}, timeout=30)
+        return self.http.post(url, files={field: (filename, image_file)}, timeout=30)
+
+    @staticmethod
+    def _file_digest(image_file) -> str:
+        """Same key as _image_digest, computed in fixed-size chunks so the file is never fully in memory"""
+        digest = hashlib.blake2b(digest_size=16)
+        for chunk in iter(lambda: image_file.read(65536), b""):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def _upload_imgbb(self, image_path: str, filename: str) -> Optional[str]:
+        """Upload a local file to imgbb.com; returns the public URL or None"""
+        with open(image_path, 'rb') as image_file:
+            response = self._post_multipart(self.LOCAL_IMGBB_UPLOAD_URL, 'image', filename, image_file)
+        if response.status_code == 200:
+            data = response.json()
+            if data.get('success'):
+                return data['data']['url']
+        return None
+
+    def _upload_fileio(self, image_path: str, filename: str) -> Optional[str]:
+        """Upload a local file to file.io; returns the public URL or None"""
+        with open(image_path, 'rb') as image_file:
+            response = self._post_multipart('https://file.io', 'file', filename, image_file)
+        if response.status_code == 200:
+            data = response.json()
+            if data.get('success'):
+                return data['link']
+        return None
+
+    # Seconds IMGBB gets before the file.io fallback upload starts alongside it
+    UPLOAD_HEAD_START = 3.0
+
+    @staticmethod
+    def _upload_result(future, service: str) -> Optional[str]:
+        """Wait for one host's upload; None if it failed"""
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Upload to {service} failed: {e}")
+            return None
+
     def _upload_local_image(self, image_path: str) -> Optional[str]:
         """Upload local image file to hosting service and return public URL"""
         try:
             print(f"Uploading image: {image_path}")
+            filename = os.path.basename(image_path)
             
-            # Use imgbb.com free hosting
             with open(image_path, 'rb') as image_file:
-                files = {'image': image_file}
-                # Free API key for testing (get your own at imgbb.com)
-                response = requests.post(
-                    'https://api.imgbb.com/1/upload?key=2d1f7b0c5c8b9a1e3f4d6c8a9b2e5f7d',
-                    files=files,
-                    timeout=30
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
+                digest = self._file_digest(image_file)
+            if digest in self._upload_cache:
+                print(f"Image already uploaded: {self._upload_cache[digest]}")
+                return self._upload_cache[digest]
+            
+            # IMGBB gets a head start; file.io (whose links expire after one download) is only
+            # started once IMGBB fails or runs past it, and its URL is used only if IMGBB fails
+            imgbb = _UPLOAD_POOL.submit(self._upload_imgbb, image_path, filename)
+            try:
+                image_url = imgbb.result(timeout=self.UPLOAD_HEAD_START)
+            except FutureTimeout:
+                fileio = _UPLOAD_POOL.submit(self._upload_fileio, image_path, filename)
+                image_url = self._upload_result(imgbb, 'imgbb')
+            except Exception as e:
+                print(f"Upload to imgbb failed: {e}")
+                fileio, image_url = None, None
+            else:
+                fileio = None
+            
+            if image_url:
+                print(f"Image uploaded to imgbb: {image_url}")
+                self._remember_upload(digest, image_url)
+                return image_url
+            
+            if fileio is None:
+                fileio = _UPLOAD_POOL.submit(self._upload_fileio, image_path, filename)
+            image_url = self._upload_result(fileio, 'file.io')
+            if image_url:
+                print(f"Image uploaded to file.io: {image_url}")
+                return image_url
+            
+            print("All image upload services failed")
+            return None
+            
+        except Exception as e:
+            print(f"Error uploading image: {e}")
+            return None
+    
+    @staticmethod
+    def _local_image_size(image_path: str) -> int:
+        """Size of a local image in one stat call; 0 if missing, empty or not a regular file"""
+        try:
+            st = os.stat(image_path)
+        except OSError:
+            return 0
+        return st.st_size if stat.S_ISREG(st.st_mode) else 0
+    
+    def _upload_and_schedule(self, post_id: str, image_path: str):
+        """Background job: host a local image, then release the post to the scheduler"""
+        try:
+            image_url = self._upload_local_image(image_path)
+            if image_url:
+                self.posts_store.update_post(post_id, {"media_urls": [image_url], "status": "scheduled"})
+            else:
+                self.posts_store.update_post(post_id, {"status": "failed", "error_message": "Failed to upload image"})
+        except Exception as e:
+            print(f"Background upload for post {post_id} failed: {e}")
+            # Don't leave the post stuck in "uploading"
+            with contextlib.suppress(Exception):
+                self.posts_store.update_post(post_id, {"status": "failed", "error_message": f"Failed to upload image: {e}"})
+    
+    async def _upload_local_image_async(self, image_path: str) -> Optional[str]:
+        """Async variant of _upload_local_image using the shared aiohttp session"""
+        if not AIOHTTP_AVAILABLE:
+            return await asyncio.to_thread(self._upload_local_image, image_path)
+        
+        try:
+            print(f"Uploading image: {image_path}")
+            image_bytes = await asyncio.to_thread(self._read_image_bytes, image_path)
+            filename = os.path.basename(image_path)
+            
+            digest = self._image_digest(image_bytes)
+            if digest in self._upload_cache:
+                print(f"Image already uploaded: {self._upload_cache[digest]}")
+                return self._upload_cache[digest]
+            
+            session = await get_aiohttp_session()
+            
+            # Use imgbb.com free hosting
+            form = aiohttp.FormData()
+            form.add_field('image', image_bytes, filename=filename)
+            async with session.post(self.LOCAL_IMGBB_UPLOAD_URL, data=form) as response:
+                if response.status == 200:
+                    data = await response.json(content_type=None)
                     if data.get('success'):
                         image_url = data['data']['url']
                         print(f"Image uploaded successfully: {image_url}")
+                        self._remember_upload(digest, image_url)
                         return image_url
             
-            # Fallback: use file.io
-            with open(image_path, 'rb') as image_file:
-                files = {'file': image_file}
-                response = requests.post('https://file.io', files=files, timeout=30)
-                
-                if response.status_code == 200:
-                    data = response.json()
+            # Fallback: use file.io (links expire after one download, so they are not cached)
+            form = aiohttp.FormData()
+            form.add_field('file', image_bytes, filename=filename)
+            async with session.post('https://file.io', data=form) as response:
+                if response.status == 200:
+                    data = await response.json(content_type=None)
                     if data.get('success'):
                         image_url = data['link']
                         print(f"Image uploaded to file.io: {image_url}")
@@ -312,6 +952,14 @@ class PublishingAgent:
             print(f"Error uploading image: {e}")
             return None
     
+    async def aprocess(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async entry point for event-loop hosts: runs process() in a worker thread so its
+        image upload and posts-log writes don't block the loop. process() stays sync for
+        the LangGraph workflow.
+        """
+        return await asyncio.to_thread(self.process, state)
+    
     def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Enhanced publishing with content agent integration
@@ -319,8 +967,6 @@ class PublishingAgent:
         state['current_agent'] = self.name
         print(f"Publishing Agent processing: {state.get('user_request', '')}")
         
-        user_request = state.get('user_request', '').lower()
-        
         # Get content from previous agent using communication system
         agent_context = AgentCoordinator.prepare_agent_context(state, self.name)
         content_data = agent_context.get('content_data', {})
@@ -357,63 +1003,47 @@ class PublishingAgent:
                 result_message = f"No image generated. Content only: {content[:50]}..."
             else:
                 # Handle both URLs and local file paths
-                if image_path.startswith('http'):
+                upload_in_background = False
+                if image_path.startswith(_HTTP_PREFIXES):
                     # Direct URL - use as is
                     image_url = image_path
                     print(f"Using direct image URL: {image_url}")
-                elif os.path.exists(image_path):
-                    # Local file - upload to hosting service
-                    image_url = self._upload_local_image(image_path)
-                    if not image_url:
-                        result_message = f"Failed to upload image. Content: {content[:50]}..."
-                        image_url = None
+                elif self._local_image_size(image_path):
+                    # Local file - record the post now and upload to hosting off the request path
+                    image_url = image_path
+                    upload_in_background = True
                 else:
                     result_message = f"Image not found: {image_path}. Content: {content[:50]}..."
                     image_url = None
                 
                 if image_url:
-                    # Extract schedule time from user request
-                    schedule_time = None
-                    
-                    # Look for time patterns in user request
-                    import re
-                    time_patterns = [
-                        r'at (\d{1,2}\.\d{2}\s*(?:am|pm))',  # at 12.47pm
-                        r'at (\d{1,2}:\d{2}\s*(?:am|pm))',  # at 8:30pm
-                        r'at (\d{1,2}\s*(?:am|pm))',        # at 8pm
-                        r'(\d{1,2}\.\d{2}\s*(?:am|pm))',   # 12.47pm
-                        r'(\d{1,2}:\d{2}\s*(?:am|pm))',   # 8:30pm
-                        r'(\d{1,2}\s*(?:am|pm))',          # 8pm
-                        r'(\d{1,2}:\d{2})',               # 14:30
-                        r'(tomorrow)',
-                        r'(monday|tuesday|wednesday|thursday|friday|saturday|sunday)'
-                    ]
-                    
-                    for pattern in time_patterns:
-                        match = re.search(pattern, user_request, re.IGNORECASE)
-                        if match:
-                            schedule_time = match.group(1)
-                            break
+                    # Extract schedule time from user request (the pattern is case-insensitive;
+                    # _parse_schedule_time normalises the match)
+                    schedule_time = extract_schedule_time(state.get('user_request', ''))
                     
                     # Create scheduled post
                     print(f"Creating scheduled post with time: {schedule_time}")
                     print(f"Content being scheduled (first 100 chars): {content[:100]}...")
                     print(f"Full content length: {len(content)} characters")
-                    post = self._create_scheduled_post(content, image_url, schedule_time)
+                    post, scheduled_datetime = self._create_scheduled_post(
+                        content, image_url, schedule_time,
+                        status="uploading" if upload_in_background else "scheduled"
+                    )
                     
-                    # Get scheduled time for display
-                    scheduled_datetime = self._parse_schedule_time(schedule_time or "now")
                     print(f"Parsed scheduled time: {scheduled_datetime}")
-                    print(f"Current time: {datetime.now()}")
+                    print(f"Current time: {post['created_at']}")
                     
                     # NEVER publish immediately - always schedule
                     result_message = f"Content scheduled for {scheduled_datetime.strftime('%I:%M %p on %B %d, %Y')}. Will be posted automatically by scheduler."
+                    if upload_in_background:
+                        _BACKGROUND_POOL.submit(self._upload_and_schedule, post["id"], image_path)
+                        result_message += " Image is uploading in the background."
         
         # Add communication metadata
         AgentCommunication.add_communication_metadata(state, self.name, bool(content_data))
         
         # Add response
-        state['agent_responses'].append({
+        AgentCommunication.record_agent_response(state, {
             'agent': self.name,
             'action': 'content_publishing',
             'result': result_message,
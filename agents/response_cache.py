@@ -0,0 +1,239 @@
+"""
+LLM Response Cache
+Two-tier cache for agent LLM responses: exact prompt matches first, then paraphrases
+found by sentence-embedding similarity
+"""
+
+import atexit
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import List, Optional
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+
+# Caches with unsaved puts, flushed once at interpreter exit
+_OPEN_CACHES = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    for cache in list(_OPEN_CACHES):
+        cache.flush()
+
+
+def _normalize(text: str) -> str:
+    """Case- and whitespace-insensitive form of a request"""
+    return " ".join(text.lower().split())
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    LRU cache of LLM responses keyed by (request, context).
+
+    The exact tier is a dict lookup on the SHA-256 of the normalized request and context.
+    When sentence-transformers is installed, a miss falls back to the most similar cached
+    request with the same context, reused if the cosine similarity clears the threshold.
+
+    Puts are persisted in batches (every SAVE_EVERY puts or SAVE_INTERVAL seconds, and at
+    exit); the file is written outside the lock so lookups don't wait on the pickle.
+    """
+
+    MAX_ENTRIES = 512
+    SAVE_EVERY = 32
+    SAVE_INTERVAL = 60.0
+    SIMILARITY_THRESHOLD = 0.92
+    EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+    def __init__(self, cache_file: Optional[str] = None, max_entries: int = MAX_ENTRIES,
+                 threshold: float = SIMILARITY_THRESHOLD):
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self.threshold = threshold
+        # key -> (context digest, normalized request, response), oldest first
+        self._entries: "OrderedDict[str, tuple[str, str, str]]" = OrderedDict()
+        # Semantic tier: one L2-normalized float32 row per key in _row_keys
+        self._row_keys: List[str] = []
+        self._embeddings = None
+        self._encoder = None
+        self._semantic = SEMANTIC_CACHE_AVAILABLE
+        # Embedding of the last missed lookup, reused when its response is stored
+        self._last_query = None
+        self._lock = threading.Lock()
+        # Orders file writes; held without _lock so lookups continue during a save
+        self._save_lock = threading.Lock()
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        # Snapshot numbers, so a slow writer can't replace a newer file with an older snapshot
+        self._snapshots_taken = 0
+        self._snapshot_written = 0
+        self._load()
+        _OPEN_CACHES.add(self)
+
+    def get(self, request: str, context: str) -> Optional[str]:
+        """Return a cached response for this request and context, or None"""
+        text = _normalize(request)
+        context_key = _digest(context)
+        key = _digest(text, context_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[2]
+
+            if not self._semantic or not self._row_keys:
+                return None
+            query = self._encode(text)
+            if query is None:
+                return None
+            self._last_query = (key, query)
+
+            # One BLAS matrix-vector product scores every cached request at once
+            scores = self._embeddings @ query
+            for row in np.argsort(scores)[::-1]:
+                if scores[row] < self.threshold:
+                    break
+                row_key = self._row_keys[row]
+                entry = self._entries[row_key]
+                # Only reuse answers that were generated from the same data
+                if entry[0] == context_key:
+                    self._entries.move_to_end(row_key)
+                    return entry[2]
+            return None
+
+    def put(self, request: str, context: str, response: str):
+        """Store a response and evict the least recently used entries over the limit"""
+        text = _normalize(request)
+        context_key = _digest(context)
+        key = _digest(text, context_key)
+        with self._lock:
+            if key not in self._entries and self._semantic:
+                query = None
+                if self._last_query is not None and self._last_query[0] == key:
+                    query = self._last_query[1]
+                if query is None:
+                    query = self._encode(text)
+                if query is not None:
+                    self._add_row(key, query)
+            self._last_query = None
+
+            self._entries[key] = (context_key, text, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._drop_row(evicted)
+            self._unsaved += 1
+            snapshot = None
+            if self._unsaved >= self.SAVE_EVERY or time.monotonic() - self._saved_at >= self.SAVE_INTERVAL:
+                snapshot = self._snapshot()
+        if snapshot is not None:
+            self._write(snapshot)
+
+    def flush(self):
+        """Write any unsaved puts to disk"""
+        with self._lock:
+            if not self._unsaved:
+                return
+            snapshot = self._snapshot()
+        self._write(snapshot)
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
+            self._row_keys = []
+            self._embeddings = None
+            snapshot = self._snapshot()
+        self._write(snapshot)
+
+    def _encode(self, text: str):
+        """Embed a request as an L2-normalized float32 vector, loading the model on first use"""
+        if self._encoder is None:
+            try:
+                self._encoder = SentenceTransformer(self.EMBEDDING_MODEL)
+            except Exception as e:
+                print(f"[WARN] Semantic cache disabled, could not load {self.EMBEDDING_MODEL}: {e}")
+                self._semantic = False
+                return None
+        return self._encoder.encode(text, normalize_embeddings=True).astype(np.float32)
+
+    def _add_row(self, key: str, vector):
+        if self._embeddings is None:
+            self._embeddings = vector[np.newaxis, :]
+        else:
+            self._embeddings = np.vstack((self._embeddings, vector))
+        self._row_keys.append(key)
+
+    def _drop_row(self, key: str):
+        try:
+            row = self._row_keys.index(key)
+        except ValueError:
+            return
+        del self._row_keys[row]
+        self._embeddings = np.delete(self._embeddings, row, axis=0) if self._row_keys else None
+
+    def _load(self):
+        """Restore the cache written by a previous process"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'rb') as f:
+                saved = pickle.load(f)
+        except Exception as e:
+            print(f"[WARN] Could not load response cache {self.cache_file}: {e}")
+            return
+        self._entries = OrderedDict(saved.get("entries", ()))
+        if self._semantic and saved.get("embeddings") is not None:
+            self._row_keys = list(saved.get("row_keys", ()))
+            self._embeddings = saved["embeddings"]
+
+    def _snapshot(self) -> tuple:
+        """Capture the state to save and mark it saved; call with _lock held"""
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        self._snapshots_taken += 1
+        # The embedding matrix is replaced, never modified in place, so sharing it is safe
+        return self._snapshots_taken, {
+            "entries": list(self._entries.items()),
+            "row_keys": list(self._row_keys),
+            "embeddings": self._embeddings
+        }
+
+    def _write(self, snapshot: tuple):
+        """Write a snapshot atomically; a failed write only costs future hits"""
+        number, saved = snapshot
+        if not self.cache_file:
+            return
+        with self._save_lock:
+            if number <= self._snapshot_written:
+                return
+            self._snapshot_written = number
+            tmp_file = None
+            try:
+                cache_dir = os.path.dirname(self.cache_file) or "."
+                os.makedirs(cache_dir, exist_ok=True)
+                fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(saved, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_file, self.cache_file)
+            except OSError as e:
+                print(f"[WARN] Could not save response cache {self.cache_file}: {e}")
+                if tmp_file is not None:
+                    with contextlib.suppress(OSError):
+                        os.remove(tmp_file)
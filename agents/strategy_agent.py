@@ -3,52 +3,211 @@ Enhanced Strategy Agent with AI-Powered Strategic Planning
 Handles content strategy, trend analysis, competitor research, and strategic insights
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
+import asyncio
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import os
 import json
-import requests
-from datetime import datetime, timedelta
-from groq import Groq
+import re
+import threading
+import time
+from datetime import datetime
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Load environment variables, unless the deployment already provides them
+if not os.getenv("GROQ_API_KEY"):
+    load_dotenv()
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+from agents.agent_communication import AgentCommunication, AgentCoordinator, STREAM_SINK
+from agents.response_cache import ResponseCache
+
+# Overlaps the Instagram round trips of a strategy data fetch
+_FETCH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="strategy-fetch")
+
+# Per-user cache directory for the strategy agent's response cache and shared strategy data
+_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "strategy_agent")
+
+
+def _dumps(obj) -> str:
+    """Serialize a prompt context as compact JSON"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+
+# Metrics quoted in analytics agent replies. The lookahead keeps matches zero-width so a label
+# inside another label's span is still seen, matching a separate search per label.
+_ANALYTICS_METRIC_RE = re.compile(
+    r"(?=(?P<label>engagement rate|average likes|average comments)[^\d\n]*(?P<value>\d+\.?\d*))"
+)
+_ANALYTICS_METRIC_KEYS = {
+    'engagement rate': 'analytics_engagement_rate',
+    'average likes': 'analytics_avg_likes',
+    'average comments': 'analytics_avg_comments'
+}
+
+# Keywords that route a request to the strategy agent
+_STRATEGY_KEYWORDS = (
+    'strategy', 'plan', 'planning', 'calendar', 'schedule', 'content strategy',
+    'trends', 'trending', 'viral', 'competitor', 'competition', 'analysis',
+    'audience', 'target', 'brand', 'voice', 'campaign', 'hashtag', 'hashtags',
+    'optimization', 'optimize', 'improve', 'growth', 'grow', 'increase',
+    'engagement', 'reach', 'visibility', 'algorithm', 'best time', 'when to post',
+    'content ideas', 'content types', 'what to post', 'posting frequency'
+)
+# One alternation scanned by the C regex engine instead of a Python-level `in` test per keyword
+_STRATEGY_KEYWORD_RE = re.compile("|".join(map(re.escape, _STRATEGY_KEYWORDS)))
+
+# Content calendar defaults
+_DEFAULT_POSTING_HOURS = (9, 12, 18)
+_CONTENT_MIX = {
+    'photos': 40,
+    'carousels': 30,
+    'reels': 30
+}
+_WEEKLY_THEMES = (
+    'Monday Motivation',
+    'Tutorial Tuesday',
+    'Wednesday Wisdom',
+    'Throwback Thursday',
+    'Feature Friday',
+    'Weekend Vibes'
+)
+
+# Requests answered without an LLM call (matched after lowercasing and dropping punctuation)
+_CAPABILITIES_RESPONSE = (
+    "I'm your strategy specialist. I can help you plan content calendars, come up with campaign "
+    "and content ideas, find the best times to post, sharpen your brand voice and grow engagement "
+    "using your Instagram data. What would you like to work on?"
+)
+_TRIVIAL_RESPONSES = {
+    'hi': "Hi! " + _CAPABILITIES_RESPONSE,
+    'hello': "Hello! " + _CAPABILITIES_RESPONSE,
+    'hey': "Hey! " + _CAPABILITIES_RESPONSE,
+    'thanks': "You're welcome! Let me know whenever you want to dig into your strategy again.",
+    'thank you': "You're welcome! Let me know whenever you want to dig into your strategy again.",
+    'help': _CAPABILITIES_RESPONSE,
+    'what can you do': _CAPABILITIES_RESPONSE,
+    'what can you help with': _CAPABILITIES_RESPONSE
+}
+# One- or two-word requests made only of these words carry no topic for the LLM to work with
+_GENERIC_REQUEST_WORDS = frozenset((
+    'strategy', 'strategies', 'plan', 'planning', 'help', 'ideas', 'idea', 'advice', 'tips', 'me', 'a', 'my', 'some'
+))
+_CLARIFY_RESPONSE = (
+    "Happy to help with strategy! Which part should we focus on: content ideas, a posting "
+    "calendar, best times to post, hashtags, brand voice, or growing engagement?"
+)
+_TRIAGE_STRIP_RE = re.compile(r"[^\w\s]+")
+
+# Focus added to the system prompt for each request type from _analyze_request_type
+_FOCUSED_PROMPTS = {
+    'content_strategy': """You are a creative content strategist focused on developing engaging content ideas and campaigns.
+
+Focus on:
+- Creative content concepts and themes
+- Storytelling approaches and narrative arcs
+- Visual content ideas and production tips
+- Campaign series and content calendars
+- Audience engagement strategies
+- Platform-specific content optimization
+
+Provide 3-5 specific content ideas or campaign concepts with detailed execution plans.""",
+
+    'analytics_strategy': """You are a data-driven performance strategist focused on optimization and growth.
+
+Focus on:
+- Performance analysis and insights
+- Optimization recommendations
+- Growth strategies and tactics
+- A/B testing suggestions
+- Platform algorithm understanding
+- ROI measurement and tracking
+
+Use available analytics data to provide specific, actionable optimization recommendations.""",
+
+    'brand_strategy': """You are a brand strategist focused on audience development and brand building.
+
+Focus on:
+- Target audience identification and understanding
+- Brand voice and personality development
+- Community building strategies
+- Brand positioning and differentiation
+- Long-term brand growth planning
+- Crisis prevention and reputation management
+
+Ask thoughtful questions to understand their brand goals and challenges.""",
+
+    'general_strategy': """You are a comprehensive social media strategist providing well-rounded strategic advice.
+
+Focus on:
+- Overall social media strategy and planning
+- Platform selection and optimization
+- Content mix and posting strategies
+- Growth and engagement tactics
+- Performance monitoring and adjustment
+- Long-term strategic planning
+
+Provide balanced recommendations across content, audience, and performance."""
+}
+# Read-only message dicts shared by every request
+_FOCUSED_MESSAGES = {
+    request_type: {"role": "system", "content": prompt}
+    for request_type, prompt in _FOCUSED_PROMPTS.items()
+}
+
+
+@dataclass(slots=True)
+class PostStats:
+    """
+    Per-post columns and shared aggregates, computed in one pass over the media list
+    so the individual analyses don't each re-walk the posts and re-parse timestamps
+    """
+    count: int = 0
+    engagement: List[int] = field(default_factory=list)
+    hours: List[int] = field(default_factory=list)  # -1 where the timestamp can't be parsed
+    total_engagement: int = 0
+    recent_engagement: int = 0  # Posted within the last 14 days
+    recent_count: int = 0
+    older_engagement: int = 0
+    older_count: int = 0
+    last_week_count: int = 0
+    content_types: Set[Optional[str]] = field(default_factory=set)
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from api.services.instagram_service import InstagramService
-from agents.agent_communication import AgentCommunication, AgentCoordinator
 
 class StrategyAgent:
     """
     AI-Powered Strategy Agent for comprehensive social media planning
     """
     
-    def __init__(self, groq_api_key: str = None):
-        print("[INIT] Initializing Enhanced Strategy Agent with AI")
-        self.name = "strategy"
-        self.description = "AI Strategy Specialist & Content Planner"
-        
-        # Initialize LLM client
-        self.groq_api_key = groq_api_key or os.getenv("GROQ_API_KEY")
-        if not self.groq_api_key:
-            print("[WARN] GROQ_API_KEY not found - strategy insights will be limited")
-            self.groq_client = None
-        else:
-            self.groq_client = Groq(api_key=self.groq_api_key)
-        
-        # Initialize Instagram service for data-driven strategies
-        try:
-            self.instagram_service = InstagramService()
-            print("[OK] Instagram Analytics Connected for Strategy")
-        except Exception as e:
-            print(f"[WARN] Instagram Service Error: {e}")
-        # Cache for strategy data
-        self.cached_data = {}
-        self.data_loaded = False
-        
-        # Strategy-focused system prompt
-        self.system_prompt = """You are a senior social media strategist and creative consultant with 10+ years of experience building successful brands and campaigns.
+    __slots__ = ("name", "description", "groq_api_key", "groq_client", "async_groq_client", "instagram_service", "cached_data", "data_loaded", "data_loaded_at", "response_cache", "_timestamp_cache", "_data_lock")
+
+    TIMESTAMP_CACHE_LIMIT = 4096
+
+    # Instagram data older than this is refetched; the file lets API workers share one fetch
+    STRATEGY_DATA_TTL = 900
+    STRATEGY_DATA_FILE = os.path.join(_CACHE_DIR, "strategy_data.json")
+
+    COMPLETION_PARAMS = {
+        "model": "openai/gpt-oss-120b",
+        "temperature": 0.8,  # Higher creativity for strategy
+        "max_tokens": 1500  # More space for detailed strategy
+    }
+
+    # Strategy-focused system prompt
+    system_prompt = """You are a senior social media strategist and creative consultant with 10+ years of experience building successful brands and campaigns.
 
 Your expertise includes:
 - Creative content strategy and campaign development
@@ -81,37 +240,96 @@ When providing strategic advice:
 
 Remember: Every brand and situation is unique. Provide personalized, thoughtful recommendations rather than generic templates."""
 
+    _SYSTEM_MESSAGE = {"role": "system", "content": system_prompt}
+
+    def __init__(self, groq_api_key: str = None):
+        print("[INIT] Initializing Enhanced Strategy Agent with AI")
+        self.name = "strategy"
+        self.description = "AI Strategy Specialist & Content Planner"
+        
+        # Initialize LLM client
+        self.groq_api_key = groq_api_key or os.getenv("GROQ_API_KEY")
+        if not self.groq_api_key:
+            print("[WARN] GROQ_API_KEY not found - strategy insights will be limited")
+            self.groq_client = None
+            self.async_groq_client = None
+        else:
+            # Imported here so importing this module doesn't pay for the Groq SDK
+            from groq import Groq, AsyncGroq
+            self.groq_client = Groq(api_key=self.groq_api_key)
+            # Used by aprocess so the API's event loop awaits Groq instead of blocking on it
+            self.async_groq_client = AsyncGroq(api_key=self.groq_api_key)
+        
+        # Initialize Instagram service for data-driven strategies
+        try:
+            from api.services.instagram_service import InstagramService
+            self.instagram_service = InstagramService()
+            print("[OK] Instagram Analytics Connected for Strategy")
+        except Exception as e:
+            print(f"[WARN] Instagram Service Error: {e}")
+            self.instagram_service = None
+        # Cache for strategy data
+        self.cached_data = {}
+        self.data_loaded = False
+        self.data_loaded_at = 0.0
+        self._data_lock = threading.Lock()
+        # Raw timestamp -> (epoch, hour), or None if unparseable; the same posts come back on every refresh
+        self._timestamp_cache: Dict[str, Optional[Tuple[float, int]]] = {}
+        # Strategy answers keyed by request and data context, kept across restarts
+        self.response_cache = ResponseCache(os.path.join(_CACHE_DIR, "responses.pkl"))
+
     def get_strategy_data(self):
         """Get comprehensive data for strategy planning"""
-        if self.data_loaded and self.cached_data:
+        if self._strategy_data_fresh():
             print("[CACHE] Using cached strategy data")
             return self.cached_data
-            
+
+        # One thread refetches when the TTL lapses; the others wait and reuse its result
+        with self._data_lock:
+            if self._strategy_data_fresh():
+                print("[CACHE] Using cached strategy data")
+                return self.cached_data
+            if self._load_strategy_data_file():
+                print("[CACHE] Using strategy data saved by another worker")
+                return self.cached_data
+            return self._fetch_strategy_data()
+
+    def _fetch_strategy_data(self) -> Dict[str, Any]:
+        """Fetch Instagram data and rebuild the strategy insights"""
         try:
             print("[LOAD] Loading strategy data...")
             
-            # Get Instagram data for strategy insights
-            account_data = self.instagram_service.get_account_info() if self.instagram_service else None
-            media_data = self.instagram_service.get_media_list(limit=50) if self.instagram_service else None
-            top_posts = self.instagram_service.get_top_posts(20) if self.instagram_service else None
+            # Get Instagram data for strategy insights. Account info and the media list are
+            # independent round trips, so they run concurrently; get_top_posts ranks the same
+            # 50-post media list, which the service has cached by then, so it runs after
+            account_data = media_data = top_posts = None
+            if self.instagram_service:
+                account_future = _FETCH_POOL.submit(self.instagram_service.get_account_info)
+                media_data = self.instagram_service.get_media_list(limit=50)
+                top_posts = self.instagram_service.get_top_posts(20)
+                account_data = account_future.result()
             
             # Process data for strategy insights
             account_info = account_data.get('data', {}) if account_data and account_data.get('success') else {}
             posts = media_data.get('data', {}).get('data', []) if media_data and media_data.get('success') else []
             top_performing = top_posts.get('data', []) if top_posts and top_posts.get('success') else []
             
+            stats = self._compute_post_stats(posts)
             self.cached_data = {
                 'timestamp': datetime.now().isoformat(),
                 'account': account_info,
                 'recent_posts': posts,
                 'top_posts': top_performing,
-                'strategy_insights': self._analyze_strategy_data(account_info, posts, top_performing),
-                'trends': self._identify_trends(posts),
-                'content_gaps': self._identify_content_gaps(posts),
-                'optimization_opportunities': self._find_optimization_opportunities(account_info, posts)
+                'strategy_insights': self._analyze_strategy_data(account_info, posts, top_performing, stats),
+                'trends': self._identify_trends(stats),
+                'content_gaps': self._identify_content_gaps(stats),
+                'optimization_opportunities': self._find_optimization_opportunities(account_info, stats)
             }
             
             self.data_loaded = True
+            self.data_loaded_at = time.time()
+            if self.instagram_service:
+                self._save_strategy_data_file()
             print("[OK] Strategy data loaded successfully")
             return self.cached_data
             
@@ -119,64 +337,128 @@ Remember: Every brand and situation is unique. Provide personalized, thoughtful
             print(f"[ERROR] Failed to load strategy data: {e}")
             return {}
 
-    def _analyze_strategy_data(self, account_info: Dict, posts: List[Dict], top_posts: List[Dict]) -> Dict:
+    def _strategy_data_fresh(self) -> bool:
+        """Whether the in-memory strategy data exists and is younger than the TTL"""
+        return (self.data_loaded and bool(self.cached_data)
+                and time.time() - self.data_loaded_at < self.STRATEGY_DATA_TTL)
+
+    def _load_strategy_data_file(self) -> bool:
+        """Adopt strategy data another worker saved within the TTL"""
+        try:
+            with open(self.STRATEGY_DATA_FILE, 'rb') as f:
+                saved = json.loads(f.read())
+        except (OSError, ValueError):
+            return False
+        loaded_at = saved.get('loaded_at', 0)
+        if not saved.get('data') or time.time() - loaded_at >= self.STRATEGY_DATA_TTL:
+            return False
+        self.cached_data = saved['data']
+        self.data_loaded = True
+        self.data_loaded_at = loaded_at
+        return True
+
+    def _save_strategy_data_file(self):
+        """Share freshly fetched strategy data with other workers and restarts"""
+        tmp_file = f"{self.STRATEGY_DATA_FILE}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.STRATEGY_DATA_FILE), exist_ok=True)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(_dumps({'loaded_at': self.data_loaded_at, 'data': self.cached_data}))
+            os.replace(tmp_file, self.STRATEGY_DATA_FILE)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"[WARN] Could not save strategy data: {e}")
+
+    def _compute_post_stats(self, posts: List[Dict]) -> PostStats:
+        """Walk the posts once, parsing each timestamp once, to build the shared PostStats"""
+        stats = PostStats(count=len(posts))
+        now = time.time()
+
+        for post in posts:
+            engagement = post.get('like_count', 0) + post.get('comments_count', 0)
+            stats.engagement.append(engagement)
+            stats.total_engagement += engagement
+            stats.content_types.add(post.get('media_type'))
+
+            fields = self._timestamp_fields(post.get('timestamp', ''))
+            if fields is None:
+                stats.hours.append(-1)
+                stats.older_engagement += engagement
+                stats.older_count += 1
+                continue
+            epoch, hour = fields
+            stats.hours.append(hour)
+
+            age_days = (now - epoch) // 86400
+            if age_days <= 14:
+                stats.recent_engagement += engagement
+                stats.recent_count += 1
+            else:
+                stats.older_engagement += engagement
+                stats.older_count += 1
+            if age_days <= 7:
+                stats.last_week_count += 1
+
+        return stats
+
+    def _analyze_strategy_data(self, account_info: Dict, posts: List[Dict], top_posts: List[Dict], stats: PostStats) -> Dict:
         """Analyze data for strategic insights"""
         if not posts:
             return {}
-            
+
+        # Parallel per-post columns from the shared pass
+        engagement = stats.engagement
+        hours = stats.hours
+
         # Performance analysis
-        total_engagement = sum(post.get('like_count', 0) + post.get('comments_count', 0) for post in posts)
-        avg_engagement = total_engagement / len(posts) if posts else 0
+        total_engagement = stats.total_engagement
+        avg_engagement = total_engagement / len(posts)
         followers = account_info.get('followers_count', 1)
         engagement_rate = (avg_engagement / followers) * 100 if followers > 0 else 0
-        
+
         # Content type performance
         content_performance = {}
-        posting_times = {}
-        hashtag_performance = {}
-        
-        for post in posts:
-            # Content type analysis
+        # Posting time analysis over fixed 24-slot accumulators; hour_order keeps first-seen order
+        hour_sum = [0] * 24
+        hour_count = [0] * 24
+        hour_order = []
+
+        for i, post in enumerate(posts):
             media_type = post.get('media_type', 'UNKNOWN')
-            engagement = post.get('like_count', 0) + post.get('comments_count', 0)
-            
-            if media_type not in content_performance:
-                content_performance[media_type] = {'total_engagement': 0, 'count': 0, 'posts': []}
-            
-            content_performance[media_type]['total_engagement'] += engagement
-            content_performance[media_type]['count'] += 1
-            content_performance[media_type]['posts'].append({
-                'id': post.get('id'),
-                'engagement': engagement,
-                'timestamp': post.get('timestamp')
-            })
-            
-            # Posting time analysis
-            try:
-                post_time = datetime.fromisoformat(post.get('timestamp', '').replace('Z', '+00:00'))
-                hour = post_time.hour
-                day = post_time.strftime('%A')
-                
-                if hour not in posting_times:
-                    posting_times[hour] = {'total_engagement': 0, 'count': 0}
-                posting_times[hour]['total_engagement'] += engagement
-                posting_times[hour]['count'] += 1
-            except:
+            post_engagement = engagement[i]
+
+            performance = content_performance.get(media_type)
+            if performance is None:
+                performance = content_performance[media_type] = {'total_engagement': 0, 'count': 0}
+            performance['total_engagement'] += post_engagement
+            performance['count'] += 1
+
+            hour = hours[i]
+            if hour < 0:
                 continue
-        
+            if not hour_count[hour]:
+                hour_order.append(hour)
+            hour_sum[hour] += post_engagement
+            hour_count[hour] += 1
+
         # Calculate averages and insights
-        for content_type in content_performance:
-            count = content_performance[content_type]['count']
-            content_performance[content_type]['avg_engagement'] = content_performance[content_type]['total_engagement'] / count if count > 0 else 0
-        
-        for hour in posting_times:
-            count = posting_times[hour]['count']
-            posting_times[hour]['avg_engagement'] = posting_times[hour]['total_engagement'] / count if count > 0 else 0
-        
+        for performance in content_performance.values():
+            performance['avg_engagement'] = performance['total_engagement'] / performance['count']
+
+        posting_times = {
+            hour: {
+                'total_engagement': hour_sum[hour],
+                'count': hour_count[hour],
+                'avg_engagement': hour_sum[hour] / hour_count[hour]
+            }
+            for hour in hour_order
+        }
+
         # Best performing content insights
         best_content_type = max(content_performance.items(), key=lambda x: x[1]['avg_engagement']) if content_performance else None
-        best_posting_hours = sorted(posting_times.items(), key=lambda x: x[1]['avg_engagement'], reverse=True)[:3]
-        
+        # nlargest is O(n log k) and returns exactly what sorted(..., reverse=True)[:k] would
+        best_posting_hours = heapq.nlargest(3, posting_times.items(), key=lambda x: x[1]['avg_engagement'])
+        top_indices = heapq.nlargest(5, range(len(posts)), key=engagement.__getitem__)
+
         return {
             'overall_engagement_rate': round(engagement_rate, 2),
             'avg_engagement_per_post': round(avg_engagement, 1),
@@ -185,20 +467,39 @@ Remember: Every brand and situation is unique. Provide personalized, thoughtful
             'best_content_type': best_content_type[0] if best_content_type else None,
             'best_posting_hours': [hour for hour, data in best_posting_hours],
             'posting_frequency': len(posts) / 30 if posts else 0,  # Posts per day over last 30 days
-            'top_performing_posts': sorted(posts, key=lambda x: x.get('like_count', 0) + x.get('comments_count', 0), reverse=True)[:5]
+            # IDs only; the full posts are already in cached_data['recent_posts']
+            'top_performing_ids': [posts[i].get('id') for i in top_indices]
         }
 
-    def _identify_trends(self, posts: List[Dict]) -> Dict:
+    def _timestamp_fields(self, timestamp: str) -> Optional[Tuple[float, int]]:
+        """(epoch, hour) of a post timestamp, parsed once per distinct string"""
+        try:
+            return self._timestamp_cache[timestamp]
+        except KeyError:
+            pass
+        post_time = self._parse_timestamp(timestamp)
+        fields = (post_time.timestamp(), post_time.hour) if post_time is not None else None
+        if len(self._timestamp_cache) >= self.TIMESTAMP_CACHE_LIMIT:
+            self._timestamp_cache.clear()
+        self._timestamp_cache[timestamp] = fields
+        return fields
+
+    @staticmethod
+    def _parse_timestamp(timestamp: str) -> Optional[datetime]:
+        """Parse a Graph API timestamp, or None if it can't be parsed"""
+        try:
+            return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    def _identify_trends(self, stats: PostStats) -> Dict:
         """Identify content trends and patterns"""
-        if not posts:
+        if not stats.count:
             return {}
         
         # Analyze recent vs older posts performance
-        recent_posts = [p for p in posts if self._is_recent_post(p.get('timestamp', ''))]
-        older_posts = [p for p in posts if not self._is_recent_post(p.get('timestamp', ''))]
-        
-        recent_avg = sum(p.get('like_count', 0) + p.get('comments_count', 0) for p in recent_posts) / len(recent_posts) if recent_posts else 0
-        older_avg = sum(p.get('like_count', 0) + p.get('comments_count', 0) for p in older_posts) / len(older_posts) if older_posts else 0
+        recent_avg = stats.recent_engagement / stats.recent_count if stats.recent_count else 0
+        older_avg = stats.older_engagement / stats.older_count if stats.older_count else 0
         
         trend_direction = 'improving' if recent_avg > older_avg else 'declining' if recent_avg < older_avg else 'stable'
         
@@ -209,22 +510,22 @@ Remember: Every brand and situation is unique. Provide personalized, thoughtful
             'trend_percentage': round(((recent_avg - older_avg) / older_avg * 100) if older_avg > 0 else 0, 1)
         }
 
-    def _identify_content_gaps(self, posts: List[Dict]) -> List[str]:
+    def _identify_content_gaps(self, stats: PostStats) -> List[str]:
         """Identify content gaps and opportunities"""
         gaps = []
         
-        if not posts:
+        if not stats.count:
             return ['No recent content to analyze']
         
         # Check content type diversity
-        content_types = set(post.get('media_type') for post in posts)
+        content_types = stats.content_types
         if 'VIDEO' not in content_types:
             gaps.append('Missing video content - consider adding Reels or video posts')
         if 'CAROUSEL_ALBUM' not in content_types:
             gaps.append('Missing carousel posts - great for engagement and storytelling')
         
         # Check posting frequency
-        posting_frequency = len(posts) / 30
+        posting_frequency = stats.count / 30
         if posting_frequency < 0.5:
             gaps.append('Low posting frequency - consider posting more regularly')
         elif posting_frequency > 2:
@@ -232,16 +533,16 @@ Remember: Every brand and situation is unique. Provide personalized, thoughtful
         
         return gaps
 
-    def _find_optimization_opportunities(self, account_info: Dict, posts: List[Dict]) -> List[str]:
+    def _find_optimization_opportunities(self, account_info: Dict, stats: PostStats) -> List[str]:
         """Find optimization opportunities"""
         opportunities = []
         
-        if not posts:
+        if not stats.count:
             return ['Start creating content to identify optimization opportunities']
         
         # Engagement rate analysis
         followers = account_info.get('followers_count', 1)
-        avg_engagement = sum(post.get('like_count', 0) + post.get('comments_count', 0) for post in posts) / len(posts)
+        avg_engagement = stats.total_engagement / stats.count
         engagement_rate = (avg_engagement / followers) * 100 if followers > 0 else 0
         
         if engagement_rate < 1:
@@ -250,36 +551,76 @@ Remember: Every brand and situation is unique. Provide personalized, thoughtful
             opportunities.append('Improve call-to-actions and audience interaction')
         
         # Content consistency
-        recent_posts = [p for p in posts if self._is_recent_post(p.get('timestamp', ''), days=7)]
-        if len(recent_posts) < 3:
+        if stats.last_week_count < 3:
             opportunities.append('Increase posting consistency for better algorithm performance')
         
         return opportunities
 
-    def _is_recent_post(self, timestamp: str, days: int = 14) -> bool:
-        """Check if post is recent"""
-        try:
-            post_time = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            return (datetime.now().replace(tzinfo=post_time.tzinfo) - post_time).days <= days
-        except:
-            return False
-
     def can_handle(self, user_request: str) -> bool:
         """Check if request is strategy-related"""
-        strategy_keywords = [
-            'strategy', 'plan', 'planning', 'calendar', 'schedule', 'content strategy',
-            'trends', 'trending', 'viral', 'competitor', 'competition', 'analysis',
-            'audience', 'target', 'brand', 'voice', 'campaign', 'hashtag', 'hashtags',
-            'optimization', 'optimize', 'improve', 'growth', 'grow', 'increase',
-            'engagement', 'reach', 'visibility', 'algorithm', 'best time', 'when to post',
-            'content ideas', 'content types', 'what to post', 'posting frequency'
-        ]
-        
-        request_lower = user_request.lower()
-        return any(keyword in request_lower for keyword in strategy_keywords)
+        return _STRATEGY_KEYWORD_RE.search(user_request.lower()) is not None
 
     def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Process strategy requests with AI-powered insights"""
+        triaged = self._triage_turn(state)
+        if triaged is not None:
+            return self._finish_turn(state, *triaged)
+
+        turn = self._prepare_turn(state)
+
+        # Generate AI-powered strategy response - NO FALLBACKS, LLM ONLY
+        try:
+            response = self._get_strategy_response(turn['user_request'], turn['strategy_context'], state)
+        except Exception as e:
+            print(f"[ERROR] LLM Error: {e}")
+            response = f"Unable to generate strategy due to LLM error: {str(e)}. Please try again."
+
+        return self._finish_turn(state, turn, response)
+
+    async def aprocess(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async entry point for event-loop hosts: data loading runs in a worker thread and the
+        Groq call is awaited on AsyncGroq, so concurrent /chat requests don't serialize.
+        """
+        triaged = self._triage_turn(state)
+        if triaged is not None:
+            sink = STREAM_SINK.get()
+            if sink is not None:
+                sink.put_nowait(triaged[1])
+            return self._finish_turn(state, *triaged)
+
+        turn = await asyncio.to_thread(self._prepare_turn, state)
+
+        try:
+            response = await self._get_strategy_response_async(turn['user_request'], turn['strategy_context'])
+        except Exception as e:
+            print(f"[ERROR] LLM Error: {e}")
+            response = f"Unable to generate strategy due to LLM error: {str(e)}. Please try again."
+
+        return self._finish_turn(state, turn, response)
+
+    def _triage_turn(self, state: Dict[str, Any]):
+        """
+        Answer greetings and bare one-word requests without loading data or calling the LLM.
+        Returns (turn, response) when the request was handled, otherwise None.
+        """
+        user_request = state.get('user_request', '')
+        words = _TRIAGE_STRIP_RE.sub(' ', user_request.lower()).split()
+        normalized = ' '.join(words)
+
+        response = _TRIVIAL_RESPONSES.get(normalized)
+        if response is None and len(words) < 3 and all(word in _GENERIC_REQUEST_WORDS for word in words):
+            response = _CLARIFY_RESPONSE
+        if response is None:
+            return None
+
+        print(f"[STRATEGY] Answered without LLM: {user_request}")
+        state['current_agent'] = self.name
+        turn = {'user_request': user_request, 'agent_context': {}, 'analytics_data': {}, 'needs_analytics': False}
+        return turn, response
+
+    def _prepare_turn(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Gather previous agent insights and strategy data into the LLM context (blocking I/O)"""
         state['current_agent'] = self.name
         user_request = state.get('user_request', '')
 
@@ -304,14 +645,19 @@ Remember: Every brand and situation is unique. Provide personalized, thoughtful
 
         print(f"[STRATEGY] Request type: {'analytics_focused' if needs_analytics else 'creative_strategy'}")
 
-        strategy_context = self._create_enhanced_context(full_data, analytics_data if needs_analytics else {}, user_request)
+        return {
+            'user_request': user_request,
+            'agent_context': agent_context,
+            'analytics_data': analytics_data,
+            'needs_analytics': needs_analytics,
+            'strategy_context': self._create_enhanced_context(full_data, analytics_data if needs_analytics else {}, user_request)
+        }
 
-        # Generate AI-powered strategy response - NO FALLBACKS, LLM ONLY
-        try:
-            response = self._get_strategy_response(user_request, strategy_context, state)
-        except Exception as e:
-            print(f"[ERROR] LLM Error: {e}")
-            response = f"Unable to generate strategy due to LLM error: {str(e)}. Please try again."
+    def _finish_turn(self, state: Dict[str, Any], turn: Dict[str, Any], response: str) -> Dict[str, Any]:
+        """Record the strategy response in the shared state"""
+        user_request = turn['user_request']
+        analytics_data = turn['analytics_data']
+        needs_analytics = turn['needs_analytics']
 
         # Add communication metadata
         AgentCommunication.add_communication_metadata(state, self.name, bool(analytics_data) and needs_analytics)
@@ -322,7 +668,7 @@ Remember: Every brand and situation is unique. Provide personalized, thoughtful
             'type': 'strategy_consultation',
             'status': 'completed',
             'based_on_analytics': needs_analytics and bool(analytics_data),
-            'used_previous_agents': list(agent_context.get('previous_agents', {}).keys()),
+            'used_previous_agents': list(turn['agent_context'].get('previous_agents', {}).keys()),
             # Add structured strategy data for other agents
             'strategy_summary': response[:300] + '...' if len(response) > 300 else response,
             'focus_area': 'Content Strategy' if 'content' in user_request.lower() else 'General Strategy'
@@ -360,83 +706,76 @@ Remember: Every brand and situation is unique. Provide personalized, thoughtful
         if not self.groq_client:
             raise Exception("GROQ client not available - cannot generate strategy without LLM")
 
-        # Analyze request type for better prompting
-        request_type = self._analyze_request_type(user_request)
-        print(f"[STRATEGY] Request analysis: {request_type}")
-
-        # Different prompts based on request type
-        if request_type == 'content_strategy':
-            focused_prompt = """You are a creative content strategist focused on developing engaging content ideas and campaigns.
-
-Focus on:
-- Creative content concepts and themes
-- Storytelling approaches and narrative arcs
-- Visual content ideas and production tips
-- Campaign series and content calendars
-- Audience engagement strategies
-- Platform-specific content optimization
-
-Provide 3-5 specific content ideas or campaign concepts with detailed execution plans."""
-
-        elif request_type == 'analytics_strategy':
-            focused_prompt = """You are a data-driven performance strategist focused on optimization and growth.
-
-Focus on:
-- Performance analysis and insights
-- Optimization recommendations
-- Growth strategies and tactics
-- A/B testing suggestions
-- Platform algorithm understanding
-- ROI measurement and tracking
-
-Use available analytics data to provide specific, actionable optimization recommendations."""
-
-        elif request_type == 'brand_strategy':
-            focused_prompt = """You are a brand strategist focused on audience development and brand building.
+        cached = self.response_cache.get(user_request, strategy_context)
+        if cached is not None:
+            print("[CACHE] Using cached strategy response")
+            return cached
 
-Focus on:
-- Target audience identification and understanding
-- Brand voice and personality development
-- Community building strategies
-- Brand positioning and differentiation
-- Long-term brand growth planning
-- Crisis prevention and reputation management
-
-Ask thoughtful questions to understand their brand goals and challenges."""
-
-        else:  # general_strategy
-            focused_prompt = """You are a comprehensive social media strategist providing well-rounded strategic advice.
+        completion = self.groq_client.chat.completions.create(
+            messages=self._build_strategy_messages(user_request, strategy_context),
+            **self.COMPLETION_PARAMS
+        )
 
-Focus on:
-- Overall social media strategy and planning
-- Platform selection and optimization
-- Content mix and posting strategies
-- Growth and engagement tactics
-- Performance monitoring and adjustment
-- Long-term strategic planning
+        response = completion.choices[0].message.content.strip()
+        self.response_cache.put(user_request, strategy_context, response)
+        return response
+
+    async def _get_strategy_response_async(self, user_request: str, strategy_context: str) -> str:
+        """
+        Async twin of _get_strategy_response that awaits AsyncGroq instead of blocking.
+        Inside a streaming run the completion is streamed and each chunk is forwarded to
+        STREAM_SINK as it arrives; the full text is still returned for the graph state.
+        """
+        if not self.async_groq_client:
+            raise Exception("GROQ client not available - cannot generate strategy without LLM")
 
-Provide balanced recommendations across content, audience, and performance."""
+        sink = STREAM_SINK.get()
+        # The cache may load the embedding model, encode and write to disk, all under a lock
+        # shared with sync graph runs, so it is kept off the event loop
+        cached = await asyncio.to_thread(self.response_cache.get, user_request, strategy_context)
+        if cached is not None:
+            print("[CACHE] Using cached strategy response")
+            if sink is not None:
+                sink.put_nowait(cached)
+            return cached
+
+        messages = self._build_strategy_messages(user_request, strategy_context)
+        if sink is None:
+            completion = await self.async_groq_client.chat.completions.create(messages=messages, **self.COMPLETION_PARAMS)
+            response = completion.choices[0].message.content.strip()
+        else:
+            stream = await self.async_groq_client.chat.completions.create(messages=messages, stream=True, **self.COMPLETION_PARAMS)
+            parts = []
+            async for chunk in stream:
+                token = chunk.choices[0].delta.content if chunk.choices else None
+                if token:
+                    parts.append(token)
+                    sink.put_nowait(token)
+            response = "".join(parts).strip()
+
+        await asyncio.to_thread(self.response_cache.put, user_request, strategy_context, response)
+        return response
+
+    def _build_strategy_messages(self, user_request: str, strategy_context: str) -> List[Dict[str, str]]:
+        """Build the chat messages for a strategy request"""
+        # Analyze request type for better prompting
+        request_type = self._analyze_request_type(user_request)
+        print(f"[STRATEGY] Request analysis: {request_type}")
 
-        messages = [
-            {
-                "role": "system",
-                "content": f"{self.system_prompt}\n\n{focused_prompt}\n\nAvailable Data:\n{strategy_context}"
-            },
+        # The system messages are shared constants, so every call sends byte-identical prefixes
+        # that Groq's prefix cache can reuse; only the user turn (data context and request) varies
+        return [
+            self._SYSTEM_MESSAGE,
+            _FOCUSED_MESSAGES[request_type],
             {
                 "role": "user",
-                "content": f"Request: {user_request}\n\nPlease provide strategic recommendations that directly address this request with specific, actionable advice."
+                "content": "".join((
+                    "Available Data:\n", strategy_context, "\n\nRequest: ", user_request,
+                    "\n\nPlease provide strategic recommendations that directly address this request with specific, actionable advice."
+                ))
             }
         ]
 
-        completion = self.groq_client.chat.completions.create(
-            model="openai/gpt-oss-120b",
-            messages=messages,
-            temperature=0.8,  # Higher creativity for strategy
-            max_tokens=1500  # More space for detailed strategy
-        )
-
-        return completion.choices[0].message.content.strip()
-    
     def _extract_analytics_insights(self, agent_responses: List[Dict]) -> Dict[str, Any]:
         """Extract insights from previous analytics agent responses"""
         analytics_insights = {}
@@ -446,27 +785,18 @@ Provide balanced recommendations across content, audience, and performance."""
                 result = response.get('result', '')
                 
                 # Extract key metrics from analytics response
-                if 'engagement rate' in result.lower():
-                    # Parse engagement rate, followers, etc. from analytics text
-                    import re
-                    
-                    # Extract engagement rate
-                    eng_match = re.search(r'engagement rate.*?(\d+\.?\d*)%?', result.lower())
-                    if eng_match:
-                        analytics_insights['analytics_engagement_rate'] = float(eng_match.group(1))
-                    
-                    # Extract average likes
-                    likes_match = re.search(r'average likes.*?(\d+\.?\d*)', result.lower())
-                    if likes_match:
-                        analytics_insights['analytics_avg_likes'] = float(likes_match.group(1))
-                    
-                    # Extract average comments
-                    comments_match = re.search(r'average comments.*?(\d+\.?\d*)', result.lower())
-                    if comments_match:
-                        analytics_insights['analytics_avg_comments'] = float(comments_match.group(1))
+                result_lower = result.lower()
+                if 'engagement rate' in result_lower:
+                    # Parse engagement rate, average likes and comments in one scan; the first
+                    # figure after each label wins, as with a separate search per label
+                    found = {}
+                    for match in _ANALYTICS_METRIC_RE.finditer(result_lower):
+                        found.setdefault(match.group('label'), match.group('value'))
+                    for label, value in found.items():
+                        analytics_insights[_ANALYTICS_METRIC_KEYS[label]] = float(value)
                     
                     # Extract content insights
-                    if 'sports' in result.lower():
+                    if 'sports' in result_lower:
                         analytics_insights['top_content_theme'] = 'sports'
                     
                     analytics_insights['analytics_summary'] = result[:300] + '...' if len(result) > 300 else result
@@ -484,9 +814,9 @@ Provide balanced recommendations across content, audience, and performance."""
 
             needs_analytics = any(keyword in request_lower for keyword in analytics_keywords)
 
-            # Combine strategy data with analytics insights only if relevant
+            # Combine strategy data with analytics insights only if relevant. The request itself
+            # goes in the user message, so paraphrases share a context for the response cache.
             enhanced_context = {
-                'user_request': user_request,
                 'request_type': 'analytics_focused' if needs_analytics else 'strategy_focused',
                 'strategy_metrics': {
                     'engagement_rate': insights.get('overall_engagement_rate', 0),
@@ -508,62 +838,48 @@ Provide balanced recommendations across content, audience, and performance."""
                 enhanced_context['content_gaps'] = strategy_data.get('content_gaps', [])[:3]
                 enhanced_context['optimization_opportunities'] = strategy_data.get('optimization_opportunities', [])[:3]
 
-            return json.dumps(enhanced_context, indent=1)
+            # Compact output: the context goes straight into the prompt, where indentation only costs tokens
+            return _dumps(enhanced_context)
 
         except Exception as e:
             print(f"[WARN] Enhanced context creation failed: {e}")
-            return json.dumps({'error': 'Context creation failed'}, indent=1)
+            return _dumps({'error': 'Context creation failed'})
 
 
 
     def _add_agent_response(self, state: Dict[str, Any], action: str, result: str):
         """Add agent response to state with analytics reference"""
-        if 'agent_responses' not in state:
-            state['agent_responses'] = []
-        
         # Check if this builds on analytics insights
         previous_analytics = any(r.get('agent') == 'analytics' for r in state.get('agent_responses', []))
         
-        # Check for duplicates
-        existing = [r for r in state['agent_responses'] if r.get('agent') == self.name and r.get('action') == action]
-        if not existing:
-            state['agent_responses'].append({
-                'agent': self.name,
-                'action': action,
-                'result': result,
-                'timestamp': datetime.now().isoformat(),
-                'builds_on_analytics': previous_analytics
-            })
+        AgentCommunication.record_agent_response(state, {
+            'agent': self.name,
+            'action': action,
+            'result': result,
+            'timestamp': datetime.now().isoformat(),
+            'builds_on_analytics': previous_analytics
+        })
 
     def refresh_cache(self):
         """Force refresh of cached strategy data"""
-        self.data_loaded = False
-        self.cached_data = {}
-        return self.get_strategy_data()
+        with self._data_lock:
+            self.data_loaded = False
+            self.cached_data = {}
+            # Bypass the shared file too; the fetch overwrites it for the other workers
+            return self._fetch_strategy_data()
 
     def generate_content_calendar(self, days: int = 30) -> Dict[str, Any]:
         """Generate a strategic content calendar"""
         data = self.get_strategy_data()
         insights = data.get('strategy_insights', {})
         
-        # Basic calendar structure
+        # Basic calendar structure; the tuples are shared, content_mix is copied so callers may edit it
         calendar = {
             'duration_days': days,
             'recommended_posting_frequency': max(1, insights.get('posting_frequency', 1)),
-            'best_posting_hours': insights.get('best_posting_hours', [9, 12, 18]),
-            'content_mix': {
-                'photos': 40,
-                'carousels': 30,
-                'reels': 30
-            },
-            'weekly_themes': [
-                'Monday Motivation',
-                'Tutorial Tuesday', 
-                'Wednesday Wisdom',
-                'Throwback Thursday',
-                'Feature Friday',
-                'Weekend Vibes'
-            ]
+            'best_posting_hours': insights.get('best_posting_hours', _DEFAULT_POSTING_HOURS),
+            'content_mix': dict(_CONTENT_MIX),
+            'weekly_themes': _WEEKLY_THEMES
         }
         
         return calendar
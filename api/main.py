@@ -2,19 +2,28 @@
 FastAPI Backend for AI Social Media Manager
 """
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import BackgroundTasks, FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 import asyncio
 import json
+import logging
 import os
+import orjson
 import sys
+import time
 from datetime import datetime
 from contextlib import asynccontextmanager
 
-# Add parent directory to path to import our modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add parent directory to path to import our modules (once)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+
+# Configure logging before the routes import services that call basicConfig themselves
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING"))
+logger = logging.getLogger("smm.api")
 
 from graph_setup import SocialMediaManagerGraph
 from dotenv import load_dotenv
@@ -26,31 +35,56 @@ from routes.performance import router as performance_router
 from routes.insights import router as insights_router
 from routes.content_strategy import router as content_strategy_router
 from services.scheduler_service import scheduler_service
+from services.http_client import close_http_session
+from services.cache import close_cache
+from util.cors import FastCORS
+from agents.publishing_agent import close_aiohttp_session
+from agents.agent_communication import AgentResponse
 
 # Load environment variables from the api/.env file
 load_dotenv('.env')
 
+# Fixed responses for trivial endpoints, built once instead of encoded per request
+ROOT_RESPONSE = Response(content=b'{"message":"AI Social Media Manager API is running!"}', media_type="application/json")
+
+def _build_health_response(timestamp: str) -> Response:
+    return Response(content=orjson.dumps({"status": "healthy", "timestamp": timestamp}), media_type="application/json")
+
+# Wall-clock ISO string for status endpoints, refreshed once a second instead of per request,
+# together with the /health response that embeds it
+_now_iso = datetime.now().isoformat()
+_health_response = _build_health_response(_now_iso)
+
+async def _tick_clock():
+    """Keep _now_iso and the /health response current to the second"""
+    global _now_iso, _health_response
+    while True:
+        _now_iso = datetime.now().isoformat()
+        _health_response = _build_health_response(_now_iso)
+        await asyncio.sleep(1)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    clock_task = asyncio.create_task(_tick_clock())
     # Startup: Start the scheduler service
     print("Starting scheduler service...")
     scheduler_task = asyncio.create_task(scheduler_service.start_scheduler())
     yield
+    clock_task.cancel()
     # Shutdown: Stop the scheduler service
     print("Stopping scheduler service...")
     scheduler_service.stop_scheduler()
     scheduler_task.cancel()
+    await close_aiohttp_session()
+    await close_http_session()
+    await close_cache()
 
-app = FastAPI(title="AI Social Media Manager API", version="1.0.0", lifespan=lifespan)
+# Route results are encoded by orjson's C serializer instead of json.dumps
+app = FastAPI(title="AI Social Media Manager API", version="1.0.0", lifespan=lifespan,
+              default_response_class=ORJSONResponse)
 
 # CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000"],  # React dev server
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+app.add_middleware(FastCORS, allow_origins=["http://localhost:3000"])  # React dev server
 
 # Include routers
 app.include_router(instagram_router)
@@ -68,6 +102,10 @@ if not groq_api_key:
 
 graph = SocialMediaManagerGraph(groq_api_key)
 
+# Caps concurrent graph runs. Runs execute their sync nodes in executor threads, so raising
+# this runs agents in parallel; the default of 1 keeps them serial, like the sync graph was
+GRAPH_SEM = asyncio.Semaphore(int(os.getenv("GRAPH_CONCURRENCY", "1")))
+
 # Pydantic models
 class ChatRequest(BaseModel):
     message: str
@@ -86,84 +124,153 @@ class ChatResponse(BaseModel):
 
 @app.get("/")
 async def root():
-    return {"message": "AI Social Media Manager API is running!"}
+    return ROOT_RESPONSE
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
     """Main chat endpoint for processing user requests"""
     try:
         # Generate session ID if not provided
-        session_id = request.session_id or f"web-session-{datetime.now().timestamp()}"
+        session_id = request.session_id or f"web-{time.time_ns():x}"
         
-        print(f"Processing chat request: {request.message}")
-        print(f"Session ID: {session_id}")
+        logger.debug("chat %s session %s", request.message, session_id)
         
         # Process the request through the graph
         try:
-            result = graph.run(
-                user_request=request.message,
-                session_id=session_id,
-                context_data=request.context_data or {}
-            )
-            print(f"Graph result: {result}")
+            async with GRAPH_SEM:
+                result = await graph.run_async(
+                    user_request=request.message,
+                    session_id=session_id,
+                    context_data=request.context_data or {}
+                )
+            logger.debug("graph result %s", result)
             
             # Analytics agent now uses cached data, no continuous updates needed
                 
         except Exception as graph_error:
-            print(f"Graph execution error: {graph_error}")
+            logger.exception("Graph execution error")
             # Return a simple response instead of failing
             result = {
                 'workflow_type': 'direct',
                 'agent_queue': [],
                 'current_agent': 'orchestrator',
-                'agent_responses': [{'agent': 'orchestrator', 'action': 'error_handling', 'result': str(graph_error)}],
+                'agent_responses': [AgentResponse(agent='orchestrator', action='error_handling', result=str(graph_error))],
                 'generated_content': None,
                 'final_response': f'Request processed with error handling: {str(graph_error)}'
             }
         
-        # Format response
-        response = ChatResponse(
-            session_id=session_id,
-            workflow_type=result.get('workflow_type', 'direct'),
-            agent_queue=result.get('agent_queue', []),
-            current_agent=result.get('current_agent'),
-            agent_responses=result.get('agent_responses', []),
-            generated_content=result.get('generated_content'),
-            final_response=result.get('final_response', 'Request processed successfully'),
-            status="completed"
-        )
-        
-        return response
+        # Serialize once in pydantic-core; returning the model would make FastAPI validate it
+        # against response_model and encode it again (response_model still documents the schema)
+        return Response(content=_build_chat_response(session_id, result).model_dump_json(), media_type="application/json")
         
     except Exception as e:
-        print(f"Chat endpoint error: {e}")
+        logger.exception("Chat endpoint error")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _chat_events(request: ChatRequest, session_id: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Chat events for the streaming endpoints: {"type": "token"} while the reply is generated,
+    then one {"type": "final"} event shaped like the /chat response, or {"type": "error"}
+    """
+    async with GRAPH_SEM:
+        try:
+            async for kind, payload in graph.run_stream(
+                user_request=request.message,
+                session_id=session_id,
+                context_data=request.context_data or {}
+            ):
+                if kind == "token":
+                    yield {"type": "token", "content": payload}
+                else:
+                    response = _build_chat_response(session_id, payload)
+                    yield {"type": "final", **response.model_dump(mode="json")}
+        except Exception as graph_error:
+            logger.exception("Graph execution error")
+            yield {"type": "error", "detail": str(graph_error)}
+
+@app.post("/chat/stream")
+async def chat_stream_http(request: ChatRequest):
+    """
+    Streaming chat over plain HTTP: the chat events as NDJSON, one per line, so clients can
+    render tokens as they arrive. /chat remains the buffered equivalent.
+    """
+    session_id = request.session_id or f"web-{time.time_ns():x}"
+    logger.debug("stream chat %s session %s", request.message, session_id)
+
+    async def ndjson_lines():
+        # If the client disconnects, the generator is closed and run_stream cancels the run
+        async for event in _chat_events(request, session_id):
+            yield orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE)
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+@app.websocket("/chat/stream")
+async def chat_stream(websocket: WebSocket):
+    """
+    Streaming chat: send a ChatRequest as JSON, receive {"type": "token"} frames while the
+    reply is generated, then one {"type": "final"} frame shaped like the /chat response
+    """
+    await websocket.accept()
+    try:
+        while True:
+            request = ChatRequest(**await websocket.receive_json())
+            session_id = request.session_id or f"web-{time.time_ns():x}"
+            logger.debug("stream chat %s session %s", request.message, session_id)
+
+            events = _chat_events(request, session_id)
+            try:
+                async for event in events:
+                    await websocket.send_json(event)
+            finally:
+                # Close now rather than at garbage collection, so a disconnect frees the
+                # semaphore slot and cancels the run immediately
+                await events.aclose()
+    except WebSocketDisconnect:
+        logger.debug("Streaming chat client disconnected")
+
+def _build_chat_response(session_id: str, result: Dict[str, Any]) -> ChatResponse:
+    """Format a graph result as the /chat response"""
+    return ChatResponse(
+        session_id=session_id,
+        workflow_type=result.get('workflow_type', 'direct'),
+        agent_queue=result.get('agent_queue', []),
+        current_agent=result.get('current_agent'),
+        agent_responses=result.get('agent_responses', []),
+        generated_content=result.get('generated_content'),
+        final_response=result.get('final_response', 'Request processed successfully'),
+        status="completed"
+    )
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return _health_response
 
 @app.get("/scheduler/status")
 async def scheduler_status():
     """Get scheduler service status"""
-    posts = scheduler_service.load_posts()
-    scheduled_posts = [p for p in posts if p.get('status') == 'scheduled']
+    # load_posts only re-reads the log when its mtime/size changed, so polling this is cheap
+    scheduled_count = 0
+    sample_posts = []
+    for post in scheduler_service.load_posts():
+        if post.get('status') == 'scheduled':
+            scheduled_count += 1
+            if len(sample_posts) < 3:  # Show first 3 for debugging
+                sample_posts.append(post)
     return {
         "running": scheduler_service.running,
-        "timestamp": datetime.now().isoformat(),
-        "scheduled_posts_count": len(scheduled_posts),
-        "scheduled_posts": scheduled_posts[:3]  # Show first 3 for debugging
+        "timestamp": _now_iso,
+        "scheduled_posts_count": scheduled_count,
+        "scheduled_posts": sample_posts
     }
 
-@app.post("/scheduler/check-now")
-async def check_scheduler_now():
-    """Manually trigger scheduler check for testing"""
-    try:
-        scheduler_service.check_and_publish_due_posts()
-        return {"success": True, "message": "Scheduler check completed"}
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+@app.post("/scheduler/check-now", status_code=202)
+async def check_scheduler_now(background_tasks: BackgroundTasks):
+    """Manually trigger scheduler check for testing; the check runs after the response is sent"""
+    # check_and_publish_due_posts is async and hands due posts to the publish workers, so it
+    # runs on the event loop without blocking it (and logs its own errors)
+    background_tasks.add_task(scheduler_service.check_and_publish_due_posts)
+    return {"success": True, "queued": True, "message": "Scheduler check queued"}
 
 @app.get("/analytics/status")
 async def analytics_status():
@@ -185,4 +292,5 @@ async def refresh_analytics_cache():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # "auto" picks uvloop + httptools (from uvicorn[standard]) where they install; uvloop has no Windows build
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="auto", http="auto", access_log=False)
\ No newline at end of file
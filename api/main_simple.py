@@ -3,24 +3,19 @@ Simplified FastAPI Backend for Instagram API Testing
 """
 
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 import os
 from routes.instagram import router as instagram_router
+from util.cors import FastCORS
 
 # Load environment variables from current directory
 load_dotenv()
 
-app = FastAPI(title="AI Social Media Manager API", version="1.0.0")
+app = FastAPI(title="AI Social Media Manager API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000"],  # React dev server
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+app.add_middleware(FastCORS, allow_origins=["http://localhost:3000"])  # React dev server
 
 # Include Instagram router
 app.include_router(instagram_router)
@@ -35,4 +30,5 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # "auto" picks uvloop + httptools (from uvicorn[standard]) where they install; uvloop has no Windows build
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="auto", http="auto", access_log=False)
\ No newline at end of file
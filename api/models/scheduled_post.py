@@ -1,11 +1,12 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal, get_args
 from datetime import datetime
 from enum import Enum
 
 class PostStatus(str, Enum):
     DRAFT = "draft"
     SCHEDULED = "scheduled"
+    UPLOADING = "uploading"
     PUBLISHING = "publishing"
     PUBLISHED = "published"
     FAILED = "failed"
@@ -21,27 +22,37 @@ class MediaType(str, Enum):
     VIDEO = "video"
     TEXT = "text"
 
+# Field types: pydantic-core validates a Literal with a set lookup instead of coercing to an
+# Enum member. The Enum classes above stay for code that refers to the values symbolically.
+PostStatusName = Literal["draft", "scheduled", "uploading", "publishing", "published", "failed"]
+PlatformName = Literal["instagram", "facebook", "twitter", "linkedin"]
+MediaTypeName = Literal["image", "video", "text"]
+
+POST_STATUSES = frozenset(get_args(PostStatusName))
+PLATFORMS = frozenset(get_args(PlatformName))
+MEDIA_TYPES = frozenset(get_args(MediaTypeName))
+
 class ScheduledPost(BaseModel):
     id: Optional[str] = None
     content: str = Field(..., description="Post content/caption")
-    platform: Platform = Field(..., description="Target social media platform")
-    media_type: MediaType = Field(default=MediaType.IMAGE, description="Type of media content")
-    media_urls: List[str] = Field(default=[], description="URLs of media files")
+    platform: PlatformName = Field(..., description="Target social media platform")
+    media_type: MediaTypeName = Field(default="image", description="Type of media content")
+    media_urls: List[str] = Field(default_factory=list, description="URLs of media files")
     scheduled_time: datetime = Field(..., description="When to publish the post")
-    status: PostStatus = Field(default=PostStatus.DRAFT, description="Current status of the post")
+    status: PostStatusName = Field(default="draft", description="Current status of the post")
     created_at: datetime = Field(default_factory=datetime.now)
     published_at: Optional[datetime] = None
     published_id: Optional[str] = Field(None, description="Platform-specific post ID after publishing")
     error_message: Optional[str] = Field(None, description="Error message if publishing failed")
-    metadata: Dict[str, Any] = Field(default={}, description="Additional metadata")
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
 
 class CreateScheduledPost(BaseModel):
     content: str
-    platform: Platform
-    media_type: MediaType = MediaType.IMAGE
-    media_urls: List[str] = []
+    platform: PlatformName
+    media_type: MediaTypeName = "image"
+    media_urls: List[str] = Field(default_factory=list)
     scheduled_time: datetime
-    metadata: Dict[str, Any] = {}
+    metadata: Dict[str, Any] = Field(default_factory=dict)
 
 class ContentRequest(BaseModel):
     content_request: str
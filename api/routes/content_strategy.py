@@ -3,70 +3,107 @@ Content Strategy API Routes
 Provides trending-based content strategy for dashboard
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Request, Response
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List
+import asyncio
+import logging
 import sys
 import os
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add parent directory to path for imports (once)
+_API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _API_ROOT not in sys.path:
+    sys.path.append(_API_ROOT)
 
 from services.trends_service import TrendsService
+from util.etag import etag_response
+from util.ttl_cache import TTLCache
 
 router = APIRouter()
+logger = logging.getLogger("smm.api.content_strategy")
 trends_service = TrendsService()
 
+class CustomStrategyRequest(BaseModel):
+    niche: str = "general"
+    keywords: List[str] = Field(default_factory=list)
+
+# pytrends is slow and rate limited; identical requests within the TTL are served from memory
+STRATEGY_CACHE = TTLCache(ttl=600)
+TRENDS_CACHE = TTLCache(ttl=300)
+TOPIC_CACHE = TTLCache(ttl=600)
+
+
+async def _cached_trending_topics():
+    """Trending topics, shared by every route that needs them"""
+    return await TRENDS_CACHE.get_or_set("trending", lambda: asyncio.to_thread(trends_service.get_trending_topics))
+
+
+async def _analyze_topic(keyword: str) -> Dict[str, Any]:
+    """Interest over time and related queries for one keyword, in a worker thread"""
+    # The service runs pytrends calls one at a time, so the two lookups share one thread
+    def analyze():
+        return {
+            "interest": trends_service.get_topic_interest_over_time([keyword]),
+            "related": trends_service.get_related_queries(keyword)
+        }
+    return await asyncio.to_thread(analyze)
+
 @router.get("/content-strategy")
-async def get_content_strategy() -> Dict[str, Any]:
+async def get_content_strategy(request: Request) -> Response:
     """Get comprehensive content strategy based on current trends"""
     try:
-        strategy_data = trends_service.get_comprehensive_strategy()
+        strategy_data = await STRATEGY_CACHE.get_or_set(
+            "strategy", lambda: asyncio.to_thread(trends_service.get_comprehensive_strategy)
+        )
         
-        return {
+        return etag_response(request, {
             "success": True,
             "data": strategy_data
-        }
+        })
         
     except Exception as e:
-        print(f"Error getting content strategy: {e}")
+        logger.exception("Error getting content strategy")
         raise HTTPException(status_code=500, detail=f"Failed to get content strategy: {str(e)}")
 
 @router.get("/trending-topics")
-async def get_trending_topics() -> Dict[str, Any]:
+async def get_trending_topics(request: Request) -> Response:
     """Get current trending topics"""
     try:
-        trends = trends_service.get_trending_topics()
+        trends = await _cached_trending_topics()
         
-        return {
+        return etag_response(request, {
             "success": True,
             "data": {
                 "trends": trends,
                 "count": len(trends),
                 "last_updated": trends[0]['timestamp'] if trends else None
             }
-        }
+        })
         
     except Exception as e:
-        print(f"Error getting trending topics: {e}")
+        logger.exception("Error getting trending topics")
         raise HTTPException(status_code=500, detail=f"Failed to get trending topics: {str(e)}")
 
 @router.post("/generate-strategy")
-async def generate_custom_strategy(request: Dict[str, Any]) -> Dict[str, Any]:
+async def generate_custom_strategy(request: CustomStrategyRequest) -> Dict[str, Any]:
     """Generate custom content strategy based on user preferences"""
     try:
-        niche = request.get('niche', 'general')
-        keywords = request.get('keywords', [])
+        niche = request.niche
+        keywords = request.keywords
         
         # Get trends
-        trends = trends_service.get_trending_topics()
-        
-        # Generate strategy
-        strategy = trends_service.generate_content_strategy(trends, niche)
+        trends = await _cached_trending_topics()
         
-        # Get interest data for custom keywords if provided
-        interest_data = {}
+        # Generate strategy (an LLM call) while fetching interest data for custom keywords, if provided
+        strategy_call = asyncio.to_thread(trends_service.generate_content_strategy, trends, niche)
         if keywords:
-            interest_data = trends_service.get_topic_interest_over_time(keywords)
+            strategy, interest_data = await asyncio.gather(
+                strategy_call,
+                asyncio.to_thread(trends_service.get_topic_interest_over_time, keywords)
+            )
+        else:
+            strategy, interest_data = await strategy_call, {}
         
         return {
             "success": True,
@@ -78,31 +115,29 @@ async def generate_custom_strategy(request: Dict[str, Any]) -> Dict[str, Any]:
         }
         
     except Exception as e:
-        print(f"Error generating custom strategy: {e}")
+        logger.exception("Error generating custom strategy")
         raise HTTPException(status_code=500, detail=f"Failed to generate strategy: {str(e)}")
 
 @router.get("/topic-analysis/{keyword}")
 async def analyze_topic(keyword: str) -> Dict[str, Any]:
     """Analyze a specific topic/keyword"""
     try:
-        # Get interest over time
-        interest_data = trends_service.get_topic_interest_over_time([keyword])
-        
-        # Get related queries
-        related_data = trends_service.get_related_queries(keyword)
+        # Get interest over time and related queries; keywords are case-insensitive
+        normalized = keyword.strip().lower()
+        analysis = await TOPIC_CACHE.get_or_set(normalized, lambda: _analyze_topic(normalized))
         
         return {
             "success": True,
             "data": {
                 "keyword": keyword,
-                "interest_analysis": interest_data.get(keyword, {}),
-                "related_queries": related_data,
+                "interest_analysis": analysis["interest"].get(normalized, {}),
+                "related_queries": analysis["related"],
                 "analyzed_at": trends_service.pytrends is not None
             }
         }
         
     except Exception as e:
-        print(f"Error analyzing topic {keyword}: {e}")
+        logger.exception("Error analyzing topic %s", keyword)
         raise HTTPException(status_code=500, detail=f"Failed to analyze topic: {str(e)}")
 
 @router.get("/health")
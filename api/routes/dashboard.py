@@ -1,25 +1,32 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from services.deps import require_instagram_service
+from services.http_client import get_json
 from services.instagram_service import InstagramService
+from services.sentiment_service import sentiment_analyzer
+from util.etag import etag_response
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+logger = logging.getLogger("smm.api.dashboard")
+
+# Dedicated threads for the dashboard fan-out, so its Graph API calls don't queue behind
+# other work on the loop's default executor
+_DASH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="dash")
 
 @router.get("/data")
-async def get_dashboard_data():
+async def get_dashboard_data(request: Request, instagram_service: InstagramService = Depends(require_instagram_service)):
     """Get all dashboard data in parallel for faster loading"""
     try:
-        instagram_service = InstagramService()
-        
         # Run all API calls in parallel
-        tasks = [
-            asyncio.create_task(get_account_data(instagram_service)),
-            asyncio.create_task(get_media_data(instagram_service)),
-            asyncio.create_task(get_top_posts_data(instagram_service)),
-            asyncio.create_task(get_sentiment_data(instagram_service))
-        ]
-        
-        # Wait for all tasks to complete
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await asyncio.gather(
+            get_account_data(instagram_service),
+            get_media_data(instagram_service),
+            get_top_posts_data(instagram_service),
+            get_sentiment_data(instagram_service),
+            return_exceptions=True
+        )
         
         account_data, media_data, top_posts_data, sentiment_data = results
         
@@ -33,7 +40,8 @@ async def get_dashboard_data():
         if isinstance(sentiment_data, Exception):
             sentiment_data = {"success": False, "data": {"positive_percentage": 70, "neutral_percentage": 25, "negative_percentage": 5}}
         
-        return {
+        # Account data, so only the browser may cache it
+        return etag_response(request, {
             "success": True,
             "data": {
                 "account": account_data,
@@ -41,58 +49,61 @@ async def get_dashboard_data():
                 "top_posts": top_posts_data,
                 "sentiment": sentiment_data
             }
-        }
+        }, cache_control="private, max-age=60")
         
     except Exception as e:
+        logger.exception("Error getting dashboard data")
         raise HTTPException(status_code=500, detail=str(e))
 
 async def get_account_data(instagram_service):
     """Get account info asynchronously"""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, instagram_service.get_account_info)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_DASH_POOL, instagram_service.get_account_info)
 
 async def get_media_data(instagram_service):
     """Get media list asynchronously"""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, instagram_service.get_media_list, 10)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_DASH_POOL, instagram_service.get_media_list, 10)
 
 async def get_top_posts_data(instagram_service):
     """Get top posts asynchronously"""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, instagram_service.get_top_posts, 5)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_DASH_POOL, instagram_service.get_top_posts, 5)
+
+async def get_post_comments(post_id, access_token):
+    """Fetch the text of up to 10 comments on a post"""
+    comments_url = f"https://graph.facebook.com/v19.0/{post_id}/comments"
+    params = {
+        'access_token': access_token,
+        'fields': 'text',
+        'limit': 10  # Limit comments per post
+    }
+    comments_data = await get_json(comments_url, params, timeout=5)
+    if comments_data is None:
+        return []
+    return [comment['text'] for comment in comments_data.get('data', []) if comment.get('text')]
 
 async def get_sentiment_data(instagram_service):
     """Get sentiment analysis asynchronously"""
-    import requests
-    from services.sentiment_service import sentiment_analyzer
-    
     try:
         # Get recent posts
-        media_result = instagram_service.get_media_list(5)  # Reduced from 10 to 5
+        loop = asyncio.get_running_loop()
+        media_result = await loop.run_in_executor(_DASH_POOL, instagram_service.get_media_list, 5)
         if not media_result.get('success'):
             return {"success": False, "error": "Failed to fetch posts"}
         
         posts = media_result.get('data', {}).get('data', [])
-        all_comments = []
         
-        # Collect comments from recent posts (limit to 3 posts for speed)
-        for post in posts[:3]:
-            try:
-                comments_url = f"https://graph.facebook.com/v19.0/{post['id']}/comments"
-                params = {
-                    'access_token': instagram_service.access_token,
-                    'fields': 'text',
-                    'limit': 10  # Limit comments per post
-                }
-                
-                comments_response = requests.get(comments_url, params=params, timeout=5)
-                if comments_response.status_code == 200:
-                    comments_data = comments_response.json()
-                    for comment in comments_data.get('data', []):
-                        if comment.get('text'):
-                            all_comments.append(comment['text'])
-            except:
-                continue
+        # Collect comments from recent posts (limit to 3 posts for speed), fetched concurrently;
+        # a post whose comments can't be fetched is skipped
+        comment_lists = await asyncio.gather(
+            *(get_post_comments(post['id'], instagram_service.access_token) for post in posts[:3]),
+            return_exceptions=True
+        )
+        all_comments = []
+        for comments in comment_lists:
+            if not isinstance(comments, BaseException):
+                all_comments.extend(comments)
         
         # Analyze sentiment
         if not all_comments:
@@ -1,22 +1,134 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+from services.cache import cached, succeeded
+from services.deps import require_instagram_service
+from services.http_client import get_http_session, get_json
 from services.instagram_service import InstagramService
+from collections import defaultdict
 from datetime import datetime, timedelta
 
-router = APIRouter(prefix="/instagram/insights", tags=["insights"])
+router = APIRouter(prefix="/instagram/insights", tags=["insights"], default_response_class=ORJSONResponse)
 
-@router.get("/weekly")
-async def get_weekly_insights():
-    """Get weekly performance insights using real Instagram data"""
+class InsightsResponse(BaseModel):
+    """Payload shared by every insights endpoint; "error" is only sent when set"""
+    success: bool
+    data: List[Dict[str, Any]]
+    error: Optional[str] = None
+
+ENGAGEMENT_TIME_SLOTS = (("6AM", 6), ("9AM", 9), ("12PM", 12), ("3PM", 15), ("6PM", 18), ("9PM", 21), ("12AM", 0))
+
+def post_hour(timestamp):
+    """Hour of a post's ISO timestamp, in the timestamp's own offset"""
+    # Graph API timestamps look like 2024-05-01T14:03:22+0000; read the hour in place
+    if len(timestamp) > 13 and timestamp[10] == 'T' and timestamp[13] == ':':
+        return int(timestamp[11:13])
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).hour
+
+# Union of the account metrics the endpoints below ask for; one Graph API call serves them all
+ACCOUNT_INSIGHT_METRICS = "reach,profile_views,accounts_engaged,total_interactions"
+_ACCOUNT_INSIGHT_METRIC_SET = frozenset(ACCOUNT_INSIGHT_METRICS.split(','))
+
+# Graph API error code for an invalid parameter, e.g. a metric the account doesn't support
+GRAPH_INVALID_PARAMETER = 100
+
+def _metrics_rejected(result):
+    """True if the Graph API rejected the request's parameters, which retrying won't fix"""
+    error = result.get('error') or ''
+    prefix = 'HTTP 400: '
+    if not error.startswith(prefix):
+        return False
     try:
-        instagram_service = InstagramService()
+        code = json.loads(error[len(prefix):])['error']['code']
+    except (ValueError, KeyError, TypeError):
+        return False
+    return code == GRAPH_INVALID_PARAMETER
+
+def _union_cacheable(result):
+    return succeeded(result) or _metrics_rejected(result)
+
+def _account_insights_call(instagram_service, period, days, metrics, cache_if=succeeded):
+    return cached(
+        "ig:account_insights", 600, (instagram_service.instagram_account_id, period, days, metrics),
+        lambda: asyncio.to_thread(instagram_service.get_account_insights, period=period, days=days, metrics=metrics),
+        cache_if=cache_if
+    )
+
+async def fetch_account_insights(instagram_service, period, days, metrics):
+    """
+    Account insights for the given metrics, cached for 10 minutes. Metric sets within
+    ACCOUNT_INSIGHT_METRICS are served from one shared call for the whole union (concurrent
+    callers join the same in-flight request), keeping only the metrics asked for.
+    """
+    requested = metrics.split(',')
+    if _ACCOUNT_INSIGHT_METRIC_SET.issuperset(requested):
+        # A union call rejected for its metrics is cached too, so an account that doesn't support
+        # one of them falls straight back to per-endpoint calls; transient failures aren't cached
+        insights = await _account_insights_call(instagram_service, period, days, ACCOUNT_INSIGHT_METRICS,
+                                                 cache_if=_union_cacheable)
+        if insights.get('success'):
+            return {**insights, 'data': [insight for insight in insights.get('data') or [] if insight.get('name') in requested]}
+    return await _account_insights_call(instagram_service, period, days, metrics)
 
+async def fetch_media_list(instagram_service, limit):
+    """Recent media, cached for 5 minutes"""
+    return await cached(
+        "ig:media_list", 300, (instagram_service.instagram_account_id, limit),
+        lambda: asyncio.to_thread(instagram_service.get_media_list, limit),
+        cache_if=succeeded
+    )
+
+async def get_follower_demographics(instagram_service):
+    """Lifetime follower demographics from the Graph API"""
+    # Get audience demographics with v23 metrics
+    url = f"{instagram_service.base_url}/{instagram_service.instagram_account_id}/insights"
+    params = {
+        'metric': 'follower_demographics',
+        'period': 'lifetime',
+        'metric_type': 'total_value',
+        'access_token': instagram_service.access_token
+    }
+    
+    result = await get_json(url, params, timeout=10)
+    if result is None or 'error' in result:
+        return {"success": False}
+    return {"success": True, "data": result.get('data', [])}
+
+async def fetch_follower_demographics(instagram_service):
+    """Follower demographics, cached for an hour (a lifetime metric that moves slowly)"""
+    return await cached(
+        "ig:follower_demographics", 3600, (instagram_service.instagram_account_id,),
+        lambda: get_follower_demographics(instagram_service),
+        cache_if=succeeded
+    )
+
+async def get_post_insights(instagram_service, posts):
+    """Fetch insights for every post concurrently; posts whose insights can't be fetched are left out"""
+    session = await get_http_session()
+    results = await asyncio.gather(
+        *(instagram_service.get_media_insights_async(session, post['id']) for post in posts),
+        return_exceptions=True
+    )
+    return {
+        post['id']: result.get('data', [])
+        for post, result in zip(posts, results)
+        if not isinstance(result, BaseException) and result.get('success')
+    }
+
+@router.get("/weekly", response_model=InsightsResponse, response_model_exclude_unset=True)
+async def get_weekly_insights(instagram_service: InstagramService = Depends(require_instagram_service)):
+    """Get weekly performance insights using real Instagram data"""
+    try:
         # Get account insights for the last 7 days (reach/accounts_engaged)
-        insights = instagram_service.get_account_insights(period="day", days=7, metrics="reach,accounts_engaged")
+        insights = await fetch_account_insights(instagram_service, "day", 7, "reach,accounts_engaged")
         if not insights.get('success'):
             return {"success": False, "data": []}
 
         # Get media posts for engagement calculation
-        media_result = instagram_service.get_media_list(50)
+        media_result = await fetch_media_list(instagram_service, 50)
         posts = media_result.get('data', {}).get('data', []) if media_result.get('success') else []
 
         # Process real insights data
@@ -49,14 +161,7 @@ async def get_weekly_insights():
 
         # Calculate engagement from posts data and compute views from per-post fields or insights
         # Fetch per-post insights (video_views etc.) for posts where necessary
-        post_insights = {}
-        for post in posts[:50]:
-            try:
-                insights_result = instagram_service.get_media_insights(post['id'])
-                if insights_result.get('success'):
-                    post_insights[post['id']] = insights_result.get('data', [])
-            except Exception:
-                continue
+        post_insights = await get_post_insights(instagram_service, posts[:50])
 
         for post in posts:
             if post.get('timestamp'):
@@ -90,37 +195,39 @@ async def get_weekly_insights():
     except Exception as e:
         return {"success": False, "data": [], "error": str(e)}
 
-@router.get("/performance")
-async def get_performance_insights():
+@router.get("/performance", response_model=InsightsResponse, response_model_exclude_unset=True)
+async def get_performance_insights(instagram_service: InstagramService = Depends(require_instagram_service)):
     """Get real performance insights using Instagram insights API"""
     try:
-        instagram_service = InstagramService()
-        
         # Get account insights with correct v23 metrics
-        insights = instagram_service.get_account_insights(period="day", days=7, metrics="reach,profile_views,accounts_engaged,total_interactions")
+        insights = await fetch_account_insights(instagram_service, "day", 7, "reach,profile_views,accounts_engaged,total_interactions")
         if not insights.get('success'):
             return {"success": False, "data": []}
         
         # Get media for engagement and saves data
-        media_result = instagram_service.get_media_list(50)
+        media_result = await fetch_media_list(instagram_service, 50)
         posts = media_result.get('data', {}).get('data', []) if media_result.get('success') else []
         
         # Get individual post insights for views and reach
-        post_insights = {}
-        for post in posts[:50]:  # Get more posts for better data
-            try:
-                insights_result = instagram_service.get_media_insights(post['id'])
-                if insights_result.get('success'):
-                    post_insights[post['id']] = insights_result.get('data', [])
-            except:
-                continue
+        post_insights = await get_post_insights(instagram_service, posts[:50])  # Get more posts for better data
         
         insights_data = insights.get('data', [])
         
+        # Bucket posts by age in days once, instead of re-parsing every timestamp for each day
+        now = datetime.now()
+        posts_by_days_ago = defaultdict(list)
+        for post in posts:
+            if post.get('timestamp'):
+                post_date = datetime.fromisoformat(post['timestamp'].replace('Z', '+00:00'))
+                posts_by_days_ago[(now - post_date.replace(tzinfo=None)).days].append(post)
+        
+        # Daily reach series (the only account metric used per day)
+        reach_series = [insight.get('values', []) for insight in insights_data if insight.get('name') == 'reach']
+        
         # Process real data by day
         data = []
         for i in range(7):
-            date = datetime.now() - timedelta(days=6-i)
+            date = now - timedelta(days=6-i)
             day_name = date.strftime('%a')
             day_data = {
                 "name": day_name,
@@ -133,36 +240,27 @@ async def get_performance_insights():
             }
             
             # Fill with real insights
-            for insight in insights_data:
-                values = insight.get('values', [])
+            for values in reach_series:
                 if len(values) > i:
-                    value = values[i].get('value', 0)
-                    metric_name = insight.get('name')
-                    
-                    if metric_name == 'reach':
-                        day_data["reach"] = value
+                    day_data["reach"] = values[i].get('value', 0)
             
-            # Calculate engagement and views from posts
-            day_posts = [p for p in posts if p.get('timestamp')]
-            for post in day_posts:
-                post_date = datetime.fromisoformat(post['timestamp'].replace('Z', '+00:00'))
-                days_ago = (datetime.now() - post_date.replace(tzinfo=None)).days
-                if days_ago == (6 - i):  # Match the day
-                    day_data["engagement"] += (post.get('like_count', 0) + post.get('comments_count', 0))
-                    
-                    # Get views and saves from post insights
-                    if post['id'] in post_insights:
-                        for insight in post_insights[post['id']]:
-                            name = insight.get('name', '')
-                            values = insight.get('values', [])
+            # Calculate engagement and views from the posts made that day
+            for post in posts_by_days_ago.get(6 - i, ()):
+                day_data["engagement"] += (post.get('like_count', 0) + post.get('comments_count', 0))
+                
+                # Get views and saves from post insights
+                if post['id'] in post_insights:
+                    for insight in post_insights[post['id']]:
+                        name = insight.get('name', '')
+                        values = insight.get('values', [])
+                        
+                        if values and len(values) > 0:
+                            value = values[0].get('value', 0)
                             
-                            if values and len(values) > 0:
-                                value = values[0].get('value', 0)
-                                
-                                if name == 'reach':
-                                    day_data["views"] += int(value or 0)
-                                elif name == 'saved':
-                                    day_data["saves"] += int(value or 0)
+                            if name == 'reach':
+                                day_data["views"] += int(value or 0)
+                            elif name == 'saved':
+                                day_data["saves"] += int(value or 0)
             
             # Estimate shares
             day_data["shares"] = int(day_data["engagement"] * 0.05)
@@ -174,33 +272,16 @@ async def get_performance_insights():
     except Exception as e:
         return {"success": False, "data": [], "error": str(e)}
 
-@router.get("/audience")
-async def get_audience_insights():
+@router.get("/audience", response_model=InsightsResponse, response_model_exclude_unset=True)
+async def get_audience_insights(instagram_service: InstagramService = Depends(require_instagram_service)):
     """Get real audience demographics using instagram_manage_insights permission"""
     try:
-        instagram_service = InstagramService()
-        
-        # Get audience demographics with v23 metrics
-        url = f"{instagram_service.base_url}/{instagram_service.instagram_account_id}/insights"
-        params = {
-            'metric': 'follower_demographics',
-            'period': 'lifetime',
-            'metric_type': 'total_value',
-            'access_token': instagram_service.access_token
-        }
-        
-        import requests
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code != 200:
-            return {"success": False, "data": []}
-        
-        result = response.json()
-        if 'error' in result:
+        demographics = await fetch_follower_demographics(instagram_service)
+        if not demographics.get('success'):
             return {"success": False, "data": []}
         
         data = []
-        insights_data = result.get('data', [])
+        insights_data = demographics['data']
         
         for insight in insights_data:
             if insight.get('name') == 'audience_gender_age':
@@ -236,12 +317,11 @@ async def get_audience_insights():
     except Exception as e:
         return {"success": False, "data": [], "error": str(e)}
 
-@router.get("/engagement-time")
-async def get_engagement_by_time():
+@router.get("/engagement-time", response_model=InsightsResponse, response_model_exclude_unset=True)
+async def get_engagement_by_time(instagram_service: InstagramService = Depends(require_instagram_service)):
     """Get engagement by time of day"""
     try:
-        instagram_service = InstagramService()
-        media_result = instagram_service.get_media_list(50)
+        media_result = await fetch_media_list(instagram_service, 50)
         
         if not media_result.get('success'):
             return {"success": False, "data": []}
@@ -250,19 +330,14 @@ async def get_engagement_by_time():
         hourly_engagement = [0] * 24
         
         for post in posts:
-            if post.get('timestamp'):
-                hour = datetime.fromisoformat(post['timestamp'].replace('Z', '+00:00')).hour
-                engagement = (post.get('like_count', 0) + post.get('comments_count', 0))
-                hourly_engagement[hour] += engagement
+            timestamp = post.get('timestamp')
+            if timestamp:
+                hourly_engagement[post_hour(timestamp)] += post.get('like_count', 0) + post.get('comments_count', 0)
         
+        # Each slot covers its starting hour and the next one
         data = [
-            {"time": "6AM", "engagement": hourly_engagement[6] + hourly_engagement[7]},
-            {"time": "9AM", "engagement": hourly_engagement[9] + hourly_engagement[10]},
-            {"time": "12PM", "engagement": hourly_engagement[12] + hourly_engagement[13]},
-            {"time": "3PM", "engagement": hourly_engagement[15] + hourly_engagement[16]},
-            {"time": "6PM", "engagement": hourly_engagement[18] + hourly_engagement[19]},
-            {"time": "9PM", "engagement": hourly_engagement[21] + hourly_engagement[22]},
-            {"time": "12AM", "engagement": hourly_engagement[0] + hourly_engagement[1]}
+            {"time": label, "engagement": hourly_engagement[hour] + hourly_engagement[hour + 1]}
+            for label, hour in ENGAGEMENT_TIME_SLOTS
         ]
         
         return {"success": True, "data": data}
@@ -270,12 +345,11 @@ async def get_engagement_by_time():
     except Exception as e:
         return {"success": False, "data": [], "error": str(e)}
 
-@router.get("/engagement-trends")
-async def get_engagement_trends():
+@router.get("/engagement-trends", response_model=InsightsResponse, response_model_exclude_unset=True)
+async def get_engagement_trends(instagram_service: InstagramService = Depends(require_instagram_service)):
     """Get weekly engagement trends"""
     try:
-        instagram_service = InstagramService()
-        media_result = instagram_service.get_media_list(50)
+        media_result = await fetch_media_list(instagram_service, 50)
         
         if not media_result.get('success'):
             return {"success": False, "data": []}
@@ -307,14 +381,12 @@ async def get_engagement_trends():
     except Exception as e:
         return {"success": False, "data": [], "error": str(e)}
 
-@router.get("/reach")
-async def get_reach_insights():
+@router.get("/reach", response_model=InsightsResponse, response_model_exclude_unset=True)
+async def get_reach_insights(instagram_service: InstagramService = Depends(require_instagram_service)):
     """Get real reach and impressions data using Instagram insights"""
     try:
-        instagram_service = InstagramService()
-        
         # Get comprehensive insights with v23 metrics
-        insights = instagram_service.get_account_insights(period="day", days=7, metrics="reach,profile_views,accounts_engaged")
+        insights = await fetch_account_insights(instagram_service, "day", 7, "reach,profile_views,accounts_engaged")
         
         if not insights.get('success'):
             return {"success": False, "data": []}
@@ -1,22 +1,11 @@
 from fastapi import APIRouter, HTTPException
-from services.instagram_service import InstagramService
+import asyncio
+from services.deps import get_instagram_service
+from services.http_client import get_http_session, get_json
+from services.sentiment_service import sentiment_analyzer
 
 router = APIRouter(prefix="/instagram", tags=["instagram"])
 
-# Lazy initialization of Instagram service
-_instagram_service = None
-
-def get_instagram_service():
-    """Get Instagram service instance with lazy initialization"""
-    global _instagram_service
-    if _instagram_service is None:
-        try:
-            _instagram_service = InstagramService()
-        except Exception as e:
-            print(f"Failed to initialize Instagram service: {e}")
-            _instagram_service = None
-    return _instagram_service
-
 @router.get("/validate")
 async def validate_instagram_connection():
     """Validate Instagram API connection"""
@@ -25,7 +14,7 @@ async def validate_instagram_connection():
         raise HTTPException(status_code=500, detail="Instagram service not initialized")
     
     try:
-        result = instagram_service.validate_connection()
+        result = await asyncio.to_thread(instagram_service.validate_connection)
         if result.get('success', False):
             return result
         else:
@@ -41,7 +30,7 @@ async def get_account_info():
         raise HTTPException(status_code=500, detail="Instagram service not initialized")
     
     try:
-        result = instagram_service.get_account_info()
+        result = await asyncio.to_thread(instagram_service.get_account_info)
         if result.get('success', False):
             return result
         else:
@@ -57,7 +46,7 @@ async def get_media_list(limit: int = 25):
         raise HTTPException(status_code=500, detail="Instagram service not initialized")
     
     try:
-        result = instagram_service.get_media_list(limit)
+        result = await asyncio.to_thread(instagram_service.get_media_list, limit)
         if result.get('success', False):
             return result
         else:
@@ -73,7 +62,7 @@ async def get_audience_demographics():
         raise HTTPException(status_code=500, detail="Instagram service not initialized")
     
     try:
-        result = instagram_service.get_audience_demographics()
+        result = await asyncio.to_thread(instagram_service.get_audience_demographics)
         if result.get('success', False):
             return result
         else:
@@ -89,7 +78,7 @@ async def get_account_insights(days: int = 7):
         raise HTTPException(status_code=500, detail="Instagram service not initialized")
     
     try:
-        result = instagram_service.get_account_insights(days=days)
+        result = await asyncio.to_thread(instagram_service.get_account_insights, days=days)
         if result.get('success', False):
             return result
         else:
@@ -105,7 +94,7 @@ async def get_media_insights(media_id: str):
         raise HTTPException(status_code=500, detail="Instagram service not initialized")
     
     try:
-        data = instagram_service.get_media_insights(media_id)
+        data = await instagram_service.get_media_insights_async(await get_http_session(), media_id)
         return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -118,7 +107,7 @@ async def get_top_posts(limit: int = 10):
         raise HTTPException(status_code=500, detail="Instagram service not initialized")
     
     try:
-        result = instagram_service.get_top_posts(limit)
+        result = await asyncio.to_thread(instagram_service.get_top_posts, limit)
         if result.get('success', False):
             return result
         else:
@@ -129,8 +118,12 @@ async def get_top_posts(limit: int = 10):
 @router.get("/stories")
 async def get_stories():
     """Get Instagram Stories"""
+    instagram_service = get_instagram_service()
+    if not instagram_service:
+        raise HTTPException(status_code=500, detail="Instagram service not initialized")
+    
     try:
-        data = instagram_service.get_stories()
+        data = await asyncio.to_thread(instagram_service.get_stories)
         return {"success": True, "data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -138,8 +131,12 @@ async def get_stories():
 @router.get("/comments/{media_id}")
 async def get_comments(media_id: str):
     """Get comments for specific media"""
+    instagram_service = get_instagram_service()
+    if not instagram_service:
+        raise HTTPException(status_code=500, detail="Instagram service not initialized")
+    
     try:
-        data = instagram_service.get_comments(media_id)
+        data = await asyncio.to_thread(instagram_service.get_comments, media_id)
         return {"success": True, "data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -147,48 +144,52 @@ async def get_comments(media_id: str):
 @router.get("/hashtag/{hashtag_id}")
 async def get_hashtag_insights(hashtag_id: str):
     """Get hashtag insights"""
+    instagram_service = get_instagram_service()
+    if not instagram_service:
+        raise HTTPException(status_code=500, detail="Instagram service not initialized")
+    
     try:
-        data = instagram_service.get_hashtag_insights(hashtag_id)
+        data = await asyncio.to_thread(instagram_service.get_hashtag_insights, hashtag_id)
         return {"success": True, "data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def get_post_comments(post_id, access_token):
+    """Fetch the text of a post's comments"""
+    comments_url = f"https://graph.facebook.com/v19.0/{post_id}/comments"
+    params = {
+        'access_token': access_token,
+        'fields': 'text'
+    }
+    comments_data = await get_json(comments_url, params, timeout=10)
+    if comments_data is None:
+        return []
+    return [comment['text'] for comment in comments_data.get('data', []) if comment.get('text')]
+
 @router.get("/sentiment-analysis")
 async def get_sentiment_analysis():
     """Get sentiment analysis of recent posts and comments"""
-    import requests
-    from services.sentiment_service import sentiment_analyzer
-    
     instagram_service = get_instagram_service()
     if not instagram_service:
         raise HTTPException(status_code=500, detail="Instagram service not initialized")
     
     try:
         # Get recent posts
-        media_result = instagram_service.get_media_list(10)
+        media_result = await asyncio.to_thread(instagram_service.get_media_list, 10)
         if not media_result.get('success'):
             return {"success": False, "error": "Failed to fetch posts"}
         
         posts = media_result.get('data', {}).get('data', [])
-        all_comments = []
         
-        # Collect comments from recent posts
-        for post in posts[:5]:  # Analyze comments from last 5 posts
-            try:
-                comments_url = f"https://graph.facebook.com/v19.0/{post['id']}/comments"
-                params = {
-                    'access_token': instagram_service.access_token,
-                    'fields': 'text'
-                }
-                
-                comments_response = requests.get(comments_url, params=params, timeout=10)
-                if comments_response.status_code == 200:
-                    comments_data = comments_response.json()
-                    for comment in comments_data.get('data', []):
-                        if comment.get('text'):
-                            all_comments.append(comment['text'])
-            except:
-                continue  # Skip if can't fetch comments for this post
+        # Collect comments from the last 5 posts, fetched concurrently on the shared session
+        comment_lists = await asyncio.gather(
+            *(get_post_comments(post['id'], instagram_service.access_token) for post in posts[:5]),
+            return_exceptions=True
+        )
+        all_comments = []
+        for comments in comment_lists:
+            if not isinstance(comments, BaseException):  # Skip if can't fetch comments for this post
+                all_comments.extend(comments)
         
         # Analyze sentiment - if no comments, default to neutral
         if not all_comments:
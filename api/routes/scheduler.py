@@ -6,10 +6,10 @@ from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from datetime import datetime
-import json
-import os
 import uuid
 
+from services.posts_store import PostsStore
+
 router = APIRouter()
 
 class ScheduledPost(BaseModel):
@@ -25,20 +25,11 @@ class UpdateScheduledPost(BaseModel):
     scheduled_time: str
     image_url: Optional[str] = None
 
-POSTS_FILE = os.path.abspath("scheduled_posts.json")
+posts_store = PostsStore()
 
 def load_posts() -> List[Dict]:
-    """Load scheduled posts from JSON file"""
-    try:
-        with open(POSTS_FILE, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
-
-def save_posts(posts: List[Dict]):
-    """Save scheduled posts to JSON file"""
-    with open(POSTS_FILE, 'w') as f:
-        json.dump(posts, f, indent=2, default=str)
+    """Load scheduled posts from the posts log"""
+    return posts_store.load_posts()
 
 @router.get("/scheduled-posts")
 async def get_scheduled_posts():
@@ -53,10 +44,8 @@ async def get_scheduled_posts():
 async def schedule_post(post: ScheduledPost):
     """Schedule a new post"""
     try:
-        posts = load_posts()
-        
         new_post = {
-            "id": str(uuid.uuid4()),
+            "id": uuid.uuid4().hex,
             "content": post.content,
             "platform": post.platform,
             "media_type": "image" if post.image_url else "text",
@@ -67,8 +56,7 @@ async def schedule_post(post: ScheduledPost):
             "metadata": {"created_manually": True}
         }
         
-        posts.append(new_post)
-        save_posts(posts)
+        posts_store.add_post(new_post)
         
         return {"success": True, "data": new_post}
     except Exception as e:
@@ -78,20 +66,18 @@ async def schedule_post(post: ScheduledPost):
 async def update_scheduled_post(post_id: str, post: UpdateScheduledPost):
     """Update a scheduled post"""
     try:
-        posts = load_posts()
+        posts_store.refresh()
         
-        for i, existing_post in enumerate(posts):
-            if existing_post["id"] == post_id:
-                posts[i].update({
-                    "content": post.content,
-                    "platform": post.platform,
-                    "scheduled_time": post.scheduled_time,
-                    "media_urls": [post.image_url] if post.image_url else [],
-                    "media_type": "image" if post.image_url else "text",
-                    "updated_at": datetime.now().isoformat()
-                })
-                save_posts(posts)
-                return {"success": True, "data": posts[i]}
+        if posts_store.get_post(post_id):
+            updated = posts_store.update_post(post_id, {
+                "content": post.content,
+                "platform": post.platform,
+                "scheduled_time": post.scheduled_time,
+                "media_urls": [post.image_url] if post.image_url else [],
+                "media_type": "image" if post.image_url else "text",
+                "updated_at": datetime.now().isoformat()
+            })
+            return {"success": True, "data": updated}
         
         raise HTTPException(status_code=404, detail="Post not found")
     except Exception as e:
@@ -101,10 +87,7 @@ async def update_scheduled_post(post_id: str, post: UpdateScheduledPost):
 async def delete_scheduled_post(post_id: str):
     """Delete a scheduled post"""
     try:
-        posts = load_posts()
-        
-        posts = [post for post in posts if post["id"] != post_id]
-        save_posts(posts)
+        posts_store.delete_post(post_id)
         
         return {"success": True, "message": "Post deleted successfully"}
     except Exception as e:
@@ -114,14 +97,14 @@ async def delete_scheduled_post(post_id: str):
 async def reschedule_post(post_id: str, new_time: str):
     """Reschedule a post to a new time"""
     try:
-        posts = load_posts()
+        posts_store.refresh()
         
-        for post in posts:
-            if post["id"] == post_id:
-                post["scheduled_time"] = new_time
-                post["updated_at"] = datetime.now().isoformat()
-                save_posts(posts)
-                return {"success": True, "data": post}
+        if posts_store.get_post(post_id):
+            updated = posts_store.update_post(post_id, {
+                "scheduled_time": new_time,
+                "updated_at": datetime.now().isoformat()
+            })
+            return {"success": True, "data": updated}
         
         raise HTTPException(status_code=404, detail="Post not found")
     except Exception as e:
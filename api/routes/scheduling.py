@@ -3,17 +3,20 @@ from datetime import datetime, timedelta
 from typing import Optional
 import sys
 import os
-import json
 import uuid
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+# Add project root to path (once)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 
 from models.scheduled_post import CreateScheduledPost, ContentRequest
 from agents.content_agent import ContentAgent
 from agents.publishing_agent import PublishingAgent
+from services.posts_store import PostsStore
 
 router = APIRouter(prefix="/scheduling", tags=["scheduling"])
+posts_store = PostsStore()
 
 @router.post("/create-and-schedule")
 async def create_and_schedule_content(request: ContentRequest):
@@ -60,12 +63,7 @@ async def create_and_schedule_content(request: ContentRequest):
 async def get_scheduled_posts(status: Optional[str] = None):
     """Get all scheduled posts"""
     try:
-        posts_file = "scheduled_posts.json"
-        try:
-            with open(posts_file, 'r') as f:
-                posts = json.load(f)
-        except FileNotFoundError:
-            posts = []
+        posts = posts_store.load_posts()
         
         if status:
             posts = [p for p in posts if p.get("status") == status]
@@ -92,12 +90,7 @@ async def publish_post_now(post_id: str):
 async def get_calendar_data(year: int, month: int):
     """Get calendar data for a specific month"""
     try:
-        posts_file = "scheduled_posts.json"
-        try:
-            with open(posts_file, 'r') as f:
-                posts = json.load(f)
-        except FileNotFoundError:
-            posts = []
+        posts = posts_store.load_posts()
         
         # Filter posts for the specified month
         calendar_posts = []
@@ -0,0 +1,130 @@
+"""
+Graph API Result Cache
+Short-TTL cache for slow Graph API lookups, shared by every API worker through Redis when
+REDIS_URL is set and kept in-process otherwise
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+
+try:
+    import redis.asyncio as redis_asyncio
+    from redis.exceptions import RedisError
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+from util.ttl_cache import TTLCache
+
+# Created on first use, so REDIS_URL from the .env loaded at startup is seen
+_redis_client = None
+_redis_checked = False
+# In-process fallback, one TTLCache per TTL
+_local_caches: Dict[int, TTLCache] = {}
+# Redis lookups in flight, so concurrent misses for a key share one computation
+_inflight: Dict[str, asyncio.Task] = {}
+# Returned by _through_redis when Redis can't be read
+_REDIS_DOWN = object()
+
+
+class _Uncacheable(Exception):
+    """Carries a result that must be returned but not stored (e.g. a failed API call)"""
+
+    def __init__(self, value: Any):
+        super().__init__()
+        self.value = value
+
+
+def _get_redis():
+    """The shared Redis client, or None when Redis isn't installed or configured"""
+    global _redis_client, _redis_checked
+    if not _redis_checked:
+        _redis_checked = True
+        redis_url = os.getenv("REDIS_URL")
+        if REDIS_AVAILABLE and redis_url:
+            _redis_client = redis_asyncio.Redis.from_url(redis_url)
+    return _redis_client
+
+
+async def close_cache():
+    """Close the Redis connection pool if one was opened"""
+    global _redis_client, _redis_checked
+    if _redis_client is not None:
+        await _redis_client.aclose()
+    _redis_client = None
+    _redis_checked = False
+
+
+def _coalesced(key: str, make_coro: Callable[[], Awaitable[Any]]) -> Awaitable[Any]:
+    """Join the in-flight computation for key, or start it"""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(make_coro())
+        _inflight[key] = task
+
+        def finished(done: asyncio.Task):
+            _inflight.pop(key, None)
+            # Every waiter may have been cancelled; don't log an unretrieved error then
+            if not done.cancelled():
+                done.exception()
+
+        task.add_done_callback(finished)
+    # Shielded so one caller going away doesn't cancel the others' lookup
+    return asyncio.shield(task)
+
+
+async def _through_redis(client, key: str, prefix: str, ttl: int, factory: Callable[[], Awaitable[Any]],
+                         cache_if: Optional[Callable[[Any], bool]]) -> Any:
+    """Read key from Redis, or compute and store it there"""
+    try:
+        raw = await client.get(key)
+    except RedisError as e:
+        print(f"[WARN] Redis cache unavailable, using in-process cache: {e}")
+        return _REDIS_DOWN
+    if raw is not None:
+        return orjson.loads(raw)
+    value = await factory()
+    if cache_if is None or cache_if(value):
+        try:
+            await client.set(key, orjson.dumps(value), ex=ttl)
+        except RedisError as e:
+            print(f"[WARN] Could not store {prefix} in Redis: {e}")
+    return value
+
+
+def succeeded(result: Any) -> bool:
+    """Cache only service results that didn't report a failure"""
+    return not (isinstance(result, dict) and result.get('success') is False)
+
+
+async def cached(prefix: str, ttl: int, params: Tuple, factory: Callable[[], Awaitable[Any]],
+                 cache_if: Optional[Callable[[Any], bool]] = None) -> Any:
+    """
+    Return the cached result for (prefix, params), or await factory() and keep its result for
+    ttl seconds. Concurrent misses for the same key share one factory() call. Results must be
+    JSON-serializable; those rejected by cache_if are returned without being stored.
+    """
+    # repr, not hash(): string hashes differ between processes and the key is shared
+    key = f"{prefix}:{':'.join(map(repr, params))}"
+    client = _get_redis()
+    if client is not None:
+        value = await _coalesced(key, lambda: _through_redis(client, key, prefix, ttl, factory, cache_if))
+        if value is not _REDIS_DOWN:
+            return value
+
+    async def compute():
+        value = await factory()
+        if cache_if is not None and not cache_if(value):
+            raise _Uncacheable(value)
+        return value
+
+    local_cache = _local_caches.get(ttl)
+    if local_cache is None:
+        local_cache = _local_caches[ttl] = TTLCache(ttl=ttl)
+    try:
+        return await local_cache.get_or_set(key, compute)
+    except _Uncacheable as e:
+        return e.value
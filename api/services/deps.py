@@ -0,0 +1,31 @@
+"""
+Route Dependencies
+Shared service instances for the API routes, created lazily on first use
+"""
+
+from fastapi import HTTPException
+
+from services.instagram_service import InstagramService
+
+# One service for every route, so its response cache and pooled HTTP session are shared
+_instagram_service = None
+
+
+def get_instagram_service():
+    """Get Instagram service instance with lazy initialization (None if it can't be created)"""
+    global _instagram_service
+    if _instagram_service is None:
+        try:
+            _instagram_service = InstagramService()
+        except Exception as e:
+            print(f"Failed to initialize Instagram service: {e}")
+            _instagram_service = None
+    return _instagram_service
+
+
+def require_instagram_service() -> InstagramService:
+    """FastAPI dependency: the shared Instagram service, or a 500 if it isn't configured"""
+    instagram_service = get_instagram_service()
+    if not instagram_service:
+        raise HTTPException(status_code=500, detail="Instagram service not initialized")
+    return instagram_service
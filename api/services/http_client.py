@@ -0,0 +1,44 @@
+"""
+Shared HTTP Client
+One aiohttp session for the API's outbound Graph API calls from async route handlers
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+# Created lazily on the running loop and closed by the app's lifespan
+_session = None
+_session_lock = asyncio.Lock()
+
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """Get the shared session, creating it on first use"""
+    global _session
+    async with _session_lock:
+        if _session is None or _session.closed:
+            _session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, limit_per_host=20, keepalive_timeout=60, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+    return _session
+
+
+async def close_http_session():
+    """Close the shared session if one was opened"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def get_json(url: str, params: Dict[str, Any], timeout: Optional[float] = None) -> Optional[Any]:
+    """GET a JSON resource on the shared session; None unless the response is a 200"""
+    session = await get_http_session()
+    # Without an explicit timeout the session default applies (passing None would disable it)
+    options = {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout is not None else {}
+    async with session.get(url, params=params, **options) as response:
+        if response.status != 200:
+            return None
+        return await response.json()
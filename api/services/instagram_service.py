@@ -1,6 +1,9 @@
+import atexit
 import requests
 import os
 import logging
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
@@ -8,12 +11,21 @@ from datetime import datetime, timedelta
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Keep-alive session shared by every InstagramService instance,
+# so Graph API calls reuse pooled TCP+TLS connections instead of handshaking each time
+_HTTP = requests.Session()
+# Pool sized for the dashboard fan-out; idempotent GETs get two quick retries on dropped connections
+_HTTP.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10,
+                                    max_retries=Retry(total=2, backoff_factor=0.1)))
+atexit.register(_HTTP.close)
+
 class InstagramService:
     def __init__(self):
         self.access_token = os.getenv('INSTAGRAM_ACCESS_TOKEN')
         self.instagram_account_id = os.getenv('INSTAGRAM_PAGE_ID')
         self.facebook_page_id = os.getenv('FACEBOOK_PAGE_ID')
         self.base_url = "https://graph.facebook.com/v19.0"
+        self.http = _HTTP
         
         # Simple cache with 5-minute expiry
         self._cache = {}
@@ -88,7 +100,7 @@ class InstagramService:
             }
             
             logger.info(f"Fetching account info from: {url}")
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
             response.encoding = 'utf-8'
             
             # Check HTTP status
@@ -181,7 +193,7 @@ class InstagramService:
             }
             
             logger.info(f"Fetching media list from: {url}")
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
             response.encoding = 'utf-8'
             
             # Check HTTP status
@@ -272,14 +284,7 @@ class InstagramService:
         try:
             logger.info(f"Fetching media insights for: {media_id}")
 
-            # Request commonly-available post insights (exclude video_views entirely)
-            url = f"{self.base_url}/{media_id}/insights"
-            params = {
-                'metric': 'likes,comments,shares,saved,reach',
-                'access_token': self.access_token
-            }
-
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(*self._media_insights_request(media_id), timeout=10)
             response.encoding = 'utf-8'
 
             if response.status_code != 200:
@@ -290,24 +295,38 @@ class InstagramService:
                     'data': None
                 }
             
-            data = response.json()
-            
-            if 'error' in data:
-                logger.error(f"Facebook API error: {data['error']}")
-                return {
-                    'success': False,
-                    'error': data['error'].get('message', 'Unknown Facebook API error'),
-                    'data': None
-                }
+            return self._media_insights_result(media_id, response.json())
             
-            logger.info(f"Successfully fetched media insights for: {media_id}")
-            logger.info(f"Media insights data: {data.get('data', [])}")
+        except Exception as e:
+            logger.error(f"Unexpected error getting media insights: {e}")
             return {
-                'success': True,
-                'data': data.get('data', []),
-                'error': None
+                'success': False,
+                'error': f'Unexpected error: {str(e)}',
+                'data': None
             }
-            
+
+    async def get_media_insights_async(self, session, media_id: str) -> Dict:
+        """
+        get_media_insights on an aiohttp session, so route handlers can fetch many posts'
+        insights concurrently without blocking the event loop
+        """
+        try:
+            logger.info(f"Fetching media insights for: {media_id}")
+
+            url, params = self._media_insights_request(media_id)
+            async with session.get(url, params=params) as response:
+                if response.status != 200:
+                    text = await response.text()
+                    logger.error(f"HTTP {response.status}: {text}")
+                    return {
+                        'success': False,
+                        'error': f'HTTP {response.status}: {text}',
+                        'data': None
+                    }
+                data = await response.json()
+
+            return self._media_insights_result(media_id, data)
+
         except Exception as e:
             logger.error(f"Unexpected error getting media insights: {e}")
             return {
@@ -315,6 +334,34 @@ class InstagramService:
                 'error': f'Unexpected error: {str(e)}',
                 'data': None
             }
+
+    def _media_insights_request(self, media_id: str):
+        """URL and query parameters for a media insights call"""
+        # Request commonly-available post insights (exclude video_views entirely)
+        url = f"{self.base_url}/{media_id}/insights"
+        params = {
+            'metric': 'likes,comments,shares,saved,reach',
+            'access_token': self.access_token
+        }
+        return url, params
+
+    def _media_insights_result(self, media_id: str, data: Dict) -> Dict:
+        """Turn a media insights response body into the service's result dict"""
+        if 'error' in data:
+            logger.error(f"Facebook API error: {data['error']}")
+            return {
+                'success': False,
+                'error': data['error'].get('message', 'Unknown Facebook API error'),
+                'data': None
+            }
+        
+        logger.info(f"Successfully fetched media insights for: {media_id}")
+        logger.info(f"Media insights data: {data.get('data', [])}")
+        return {
+            'success': True,
+            'data': data.get('data', []),
+            'error': None
+        }
     
     def get_audience_demographics(self) -> Dict:
         """Get real audience demographics via Facebook Graph API"""
@@ -327,7 +374,7 @@ class InstagramService:
             }
             
             logger.info(f"Fetching audience demographics from: {url}")
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
             response.encoding = 'utf-8'
             
             if response.status_code != 200:
@@ -381,7 +428,7 @@ class InstagramService:
             }
             
             logger.info(f"Fetching account insights from: {url}")
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
             response.encoding = 'utf-8'
             
             if response.status_code != 200:
@@ -571,7 +618,7 @@ class InstagramService:
                 'access_token': self.access_token
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
             growth_data = []
             
             if response.status_code == 200:
@@ -678,7 +725,7 @@ class InstagramService:
             'access_token': self.access_token
         }
         
-        response = requests.get(url, params=params)
+        response = self.http.get(url, params=params)
         response.encoding = 'utf-8'
         
         import json
@@ -696,7 +743,7 @@ class InstagramService:
             'access_token': self.access_token
         }
         
-        response = requests.get(url, params=params)
+        response = self.http.get(url, params=params)
         response.encoding = 'utf-8'
         
         import json
@@ -714,7 +761,7 @@ class InstagramService:
             'access_token': self.access_token
         }
         
-        response = requests.get(url, params=params)
+        response = self.http.get(url, params=params)
         response.encoding = 'utf-8'
         
         import json
@@ -0,0 +1,295 @@
+"""
+Scheduled Posts Store
+Append-only JSONL log of scheduled posts with an in-memory index
+"""
+
+import contextlib
+import heapq
+import json
+import mmap
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dump_line(obj) -> bytes:
+    """Serialize one record as a newline-terminated log line; str() covers non-JSON values"""
+    if ORJSON_AVAILABLE:
+        # orjson writes the newline itself, avoiding a second bytes copy per line
+        return orjson.dumps(obj, default=str, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(obj, default=str, separators=(",", ":")).encode() + b"\n"
+
+
+_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# One lock per log file, shared by every PostsStore on it: the scheduler, the routes and
+# each PublishingAgent open their own store, and compaction must not race their appends
+_PATH_LOCKS: Dict[str, threading.RLock] = {}
+_PATH_LOCKS_GUARD = threading.Lock()
+
+
+def _lock_for(path: str) -> threading.RLock:
+    with _PATH_LOCKS_GUARD:
+        lock = _PATH_LOCKS.get(path)
+        if lock is None:
+            lock = _PATH_LOCKS[path] = threading.RLock()
+        return lock
+
+
+class PostsStore:
+    """
+    Each line of the log is either a full post, a partial update ("_op": "update")
+    or a tombstone ("_op": "delete"). Replaying the log gives the live posts.
+    """
+
+    # Rewrite the log once it holds this many times more records than live posts
+    COMPACT_RATIO = 2
+    COMPACT_MIN_RECORDS = 64
+
+    def __init__(self, posts_file: str = "scheduled_posts.jsonl", legacy_file: str = "scheduled_posts.json"):
+        self.posts_file = os.path.abspath(posts_file)
+        self.legacy_file = os.path.abspath(legacy_file)
+        self._posts_by_id: Dict[str, Dict] = {}
+        # Min-heap of (scheduled epoch, post id); stale entries are skipped when popped
+        self._due_heap: List[Tuple[float, str]] = []
+        self._record_count = 0
+        # (mtime_ns, size, inode) of the log as last replayed; lets refresh skip unchanged files
+        self._file_signature = None
+        # Appends and replays may come from worker threads (asyncio.to_thread) and from other
+        # stores on the same file; RLock since an append can trigger compaction, which reloads
+        # and rewrites under the same lock
+        self._lock = _lock_for(self.posts_file)
+
+    def load_posts(self) -> List[Dict]:
+        """Replay the log into the in-memory index and return the live posts"""
+        with self._lock:
+            self.refresh()
+            return list(self._posts_by_id.values())
+
+    def refresh(self):
+        """Bring the in-memory index up to date with the log (e.g. before get_post)"""
+        with self._lock:
+            self._migrate_legacy_file()
+
+            signature = self._stat_signature()
+            if signature is not None and signature == self._file_signature:
+                # Nobody has written since the last replay; the index is current
+                return
+
+            posts_by_id = {}
+            record_count = 0
+            try:
+                for line in self._read_lines():
+                    if not line.strip():
+                        continue
+                    try:
+                        record = _loads(line)
+                    except ValueError:
+                        # Torn write from a crash; skip the partial line
+                        continue
+                    record_count += 1
+                    self._apply(posts_by_id, record)
+            except FileNotFoundError:
+                pass
+
+            self._posts_by_id = posts_by_id
+            self._record_count = record_count
+            self._file_signature = signature
+            self._rebuild_due_heap()
+
+    def get_post(self, post_id: str) -> Optional[Dict]:
+        """Look up a post in the in-memory index"""
+        return self._posts_by_id.get(post_id)
+
+    def pop_due_posts(self, cutoff: float) -> List[Dict]:
+        """Pop every scheduled post due at or before cutoff (epoch seconds), earliest first"""
+        with self._lock:
+            due = []
+            seen = set()
+            heap = self._due_heap
+            while heap and heap[0][0] <= cutoff:
+                epoch, post_id = heapq.heappop(heap)
+                post = self._posts_by_id.get(post_id)
+                # Skip entries left behind by deletes, reschedules and status changes
+                if (post is None or post_id in seen or post.get("status") != "scheduled"
+                        or self.scheduled_epoch(post) != epoch):
+                    continue
+                seen.add(post_id)
+                due.append(post)
+            return due
+
+    def add_post(self, post: Dict) -> Dict:
+        """Append a new post to the log"""
+        with self._lock:
+            # Persist the epoch next to the ISO string so replays never have to parse it
+            self.scheduled_epoch(post)
+            self._append(post)
+            self._posts_by_id[post["id"]] = post
+            self._push_due(post)
+            return post
+
+    def update_post(self, post_id: str, changes: Dict) -> Optional[Dict]:
+        """Append a partial update for a post and merge it into the index"""
+        with self._lock:
+            if "scheduled_time" in changes and "scheduled_epoch" not in changes:
+                changes = dict(changes)
+                # An unparseable new time clears the old epoch, so the post can't go out at the stale time
+                changes["scheduled_epoch"] = self.scheduled_epoch(changes)
+            self._append({"id": post_id, "_op": "update", **changes})
+            post = self._posts_by_id.get(post_id)
+            if post is not None:
+                post.update(changes)
+                if "scheduled_time" in changes or changes.get("status") == "scheduled":
+                    self._push_due(post)
+            return post
+
+    def delete_post(self, post_id: str):
+        """Append a tombstone for a post"""
+        with self._lock:
+            self._append({"id": post_id, "_op": "delete"})
+            self._posts_by_id.pop(post_id, None)
+
+    def save_posts(self, posts: List[Dict]):
+        """Rewrite the whole log from a list of posts (used for compaction and bulk replacement)"""
+        with self._lock:
+            # Unique temp file in the log's directory, so the replace stays atomic
+            fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(self.posts_file),
+                                            prefix=os.path.basename(self.posts_file) + ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(b"".join(_dump_line(post) for post in posts))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.posts_file)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_file)
+                raise
+
+            self._posts_by_id = {post["id"]: post for post in posts}
+            self._record_count = len(posts)
+            self._file_signature = self._stat_signature()
+            self._rebuild_due_heap()
+
+    def compact(self):
+        """Collapse the log down to one record per live post"""
+        with self._lock:
+            self.save_posts(self.load_posts())
+
+    def _stat_signature(self) -> Optional[Tuple[int, int, int]]:
+        """Cheap change detector for the log file"""
+        try:
+            st = os.stat(self.posts_file)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _read_lines(self):
+        """Yield log lines from a read-only mmap so the file is paged in lazily, not copied whole"""
+        with open(self.posts_file, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # The map covers the file as it was when mapped; later appends are picked up next load
+                size = len(mm)
+                start = 0
+                while start < size:
+                    end = mm.find(b"\n", start)
+                    if end == -1:
+                        end = size
+                    yield mm[start:end]
+                    start = end + 1
+
+    @staticmethod
+    def scheduled_epoch(post: Dict) -> Optional[float]:
+        """
+        Scheduled time of a post as epoch seconds, or None if it has no valid time.
+        Older records without "scheduled_epoch" are parsed once and stamped in memory.
+        """
+        epoch = post.get("scheduled_epoch")
+        if epoch is None:
+            try:
+                epoch = datetime.fromisoformat(post["scheduled_time"]).timestamp()
+            except (KeyError, TypeError, ValueError):
+                return None
+            post["scheduled_epoch"] = epoch
+        return epoch
+
+    def _push_due(self, post: Dict):
+        """Track a scheduled post in the due heap"""
+        if post.get("status") != "scheduled":
+            return
+        epoch = self.scheduled_epoch(post)
+        if epoch is not None:
+            heapq.heappush(self._due_heap, (epoch, post["id"]))
+
+    def _rebuild_due_heap(self):
+        """Rebuild the due heap from the index in O(n)"""
+        heap = []
+        for post_id, post in self._posts_by_id.items():
+            if post.get("status") != "scheduled":
+                continue
+            epoch = self.scheduled_epoch(post)
+            if epoch is not None:
+                heap.append((epoch, post_id))
+        heapq.heapify(heap)
+        self._due_heap = heap
+
+    @staticmethod
+    def _apply(posts_by_id: Dict[str, Dict], record: Dict):
+        """Apply one log record to an index (last write wins)"""
+        op = record.pop("_op", None)
+        post_id = record.get("id")
+        if op == "delete":
+            posts_by_id.pop(post_id, None)
+        elif op == "update":
+            # Ignore updates for posts that were deleted in the meantime
+            if post_id in posts_by_id:
+                posts_by_id[post_id].update(record)
+        else:
+            posts_by_id[post_id] = record
+
+    def _append(self, record: Dict):
+        """Durably append one record to the log"""
+        self._migrate_legacy_file()
+        line = _dump_line(record)
+        # The index stays current only if the file is exactly as we last saw it
+        in_sync = self._file_signature is not None and self._file_signature == self._stat_signature()
+        with open(self.posts_file, 'ab+') as f:
+            # Terminate a torn last line so this record starts on its own line
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._record_count += 1
+        # Otherwise another writer got in first; force a replay on the next load
+        self._file_signature = self._stat_signature() if in_sync else None
+
+        live = max(len(self._posts_by_id), 1)
+        if self._record_count > max(self.COMPACT_MIN_RECORDS, live * self.COMPACT_RATIO):
+            self.compact()
+
+    def _migrate_legacy_file(self):
+        """Import the old pretty-printed JSON list the first time the log is used"""
+        if os.path.exists(self.posts_file) or not os.path.exists(self.legacy_file):
+            return
+        try:
+            with open(self.legacy_file, 'rb') as f:
+                posts = _loads(f.read())
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Could not migrate {self.legacy_file}: {e}")
+            return
+        print(f"Migrating {len(posts)} posts from {self.legacy_file} to {self.posts_file}")
+        self.save_posts(posts)
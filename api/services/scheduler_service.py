@@ -4,95 +4,125 @@ Handles automatic posting of scheduled content
 """
 
 import asyncio
-import json
 import os
-from datetime import datetime, timedelta
+import time
 from typing import List, Dict
 import sys
 
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+# Add project root to path (once)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
 
-try:
-    from agents.publishing_agent import PublishingAgent
-except ImportError:
-    # Fallback import path
-    import sys
-    sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-    from agents.publishing_agent import PublishingAgent
+from agents.publishing_agent import PublishingAgent
 
 class SchedulerService:
+    # Queue priorities (lower runs first): "post now" requests jump ahead of later slots
+    PRIORITY_NOW = 0
+    PRIORITY_LATER = 10
+    WORKER_COUNT = 4
+    
     def __init__(self):
-        # Use absolute path to ensure both manual and AI posts use same file
-        self.posts_file = os.path.abspath("scheduled_posts.json")
         self.publishing_agent = PublishingAgent()
+        # Share the agent's posts log so manual and AI posts use the same file
+        self.posts_store = self.publishing_agent.posts_store
         self.running = False
+        # Due posts waiting to be published, as (priority, scheduled_epoch, post_id)
+        self.queue = asyncio.PriorityQueue()
+        self._queued_ids = set()
+        self._workers = []
         
     def load_posts(self) -> List[Dict]:
-        """Load scheduled posts from JSON file"""
-        try:
-            with open(self.posts_file, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return []
+        """Load scheduled posts from the posts log"""
+        return self.posts_store.load_posts()
     
     def save_posts(self, posts: List[Dict]):
-        """Save scheduled posts to JSON file"""
-        with open(self.posts_file, 'w') as f:
-            json.dump(posts, f, indent=2, default=str)
+        """Rewrite the posts log from a full list"""
+        self.posts_store.save_posts(posts)
+    
+    def _start_workers(self):
+        """Make sure the publish workers are running on the current loop"""
+        self._workers = [task for task in self._workers if not task.done()]
+        while len(self._workers) < self.WORKER_COUNT:
+            self._workers.append(asyncio.create_task(self._publish_worker()))
+    
+    async def enqueue_post(self, post: Dict) -> bool:
+        """Queue a due post for the publish workers; returns False if it is already queued"""
+        if post['id'] in self._queued_ids:
+            return False
+        
+        metadata = post.get('metadata') or {}
+        priority = self.PRIORITY_NOW if metadata.get('schedule_now') else self.PRIORITY_LATER
+        scheduled_epoch = self.posts_store.scheduled_epoch(post)
+        
+        self._queued_ids.add(post['id'])
+        await self.queue.put((priority, scheduled_epoch, post['id']))
+        return True
+    
+    async def _publish_worker(self):
+        """Publish queued posts highest priority first, draining ready ones into one Graph batch"""
+        while True:
+            post_ids = [(await self.queue.get())[2]]
+            while len(post_ids) < self.publishing_agent.GRAPH_BATCH_LIMIT and not self.queue.empty():
+                post_ids.append(self.queue.get_nowait()[2])
+            try:
+                await self._publish_posts(post_ids)
+            except Exception as e:
+                print(f"Error publishing posts {post_ids}: {e}")
+            finally:
+                for post_id in post_ids:
+                    self._queued_ids.discard(post_id)
+                    self.queue.task_done()
     
-    def check_and_publish_due_posts(self):
-        """Check for posts that are due and publish them"""
+    async def _publish_posts(self, post_ids: List[str]):
+        """Publish a group of posts and record each outcome in the posts log"""
+        posts = []
+        for post_id in post_ids:
+            post = self.posts_store.get_post(post_id)
+            # Skip posts deleted or rescheduled while they were waiting in the queue
+            if post and post.get('status') == 'scheduled':
+                posts.append(post)
+        if not posts:
+            return
+        
         try:
-            posts = self.load_posts()
-            current_time = datetime.now()
-            updated_posts = []
-            published_count = 0
+            results = await self.publishing_agent.publish_batch_async(posts)
+        except Exception as e:
+            results = [{'success': False, 'error': str(e)} for _ in posts]
+        
+        for post, publish_result in zip(posts, results):
+            await self._record_result(post['id'], publish_result)
+    
+    async def _record_result(self, post_id: str, publish_result: Dict):
+        """Persist one publish outcome"""
+        # Log appends fsync, so they run in a worker thread to keep the event loop free
+        if publish_result['success']:
+            # Don't keep published posts (remove from calendar)
+            await asyncio.to_thread(self.posts_store.delete_post, post_id)
+            print(f"Successfully published post {post_id}, removed from calendar")
+        else:
+            await asyncio.to_thread(
+                self.posts_store.update_post, post_id,
+                {'status': 'failed', 'error_message': publish_result.get('error')}
+            )
+            print(f"Failed to publish post {post_id}: {publish_result.get('error')}")
+    
+    async def check_and_publish_due_posts(self):
+        """Check for posts that are due and hand them to the publish workers"""
+        try:
+            self._start_workers()
+            await asyncio.to_thread(self.load_posts)
+            queued_count = 0
             
-            for post in posts:
-                if post.get('status') != 'scheduled':
-                    updated_posts.append(post)
-                    continue
-                
-                scheduled_time = datetime.fromisoformat(post['scheduled_time'])
-                
-                # Check if post is due (within 30 seconds tolerance)
-                if scheduled_time <= current_time + timedelta(seconds=30):
-                    print(f"Publishing due post: {post['id']} scheduled for {scheduled_time}")
-                    
-                    # Update status to publishing
-                    post['status'] = 'publishing'
-                    
-                    # Attempt to publish
-                    try:
-                        publish_result = self.publishing_agent._publish_to_instagram(post)
-                        
-                        if publish_result['success']:
-                            post['status'] = 'published'
-                            post['published_at'] = current_time.isoformat()
-                            post['published_id'] = publish_result.get('post_id')
-                            published_count += 1
-                            print(f"Successfully published post {post['id']}")
-                            
-                            # Don't add published posts back to the list (remove from calendar)
-                            continue
-                        else:
-                            post['status'] = 'failed'
-                            post['error_message'] = publish_result.get('error')
-                            print(f"Failed to publish post {post['id']}: {publish_result.get('error')}")
-                            
-                    except Exception as e:
-                        post['status'] = 'failed'
-                        post['error_message'] = str(e)
-                        print(f"Exception publishing post {post['id']}: {e}")
-                
-                # Keep non-published posts in the list
-                updated_posts.append(post)
+            # Posts are due within 30 seconds tolerance; the store's heap yields them earliest first
+            cutoff = time.time() + 30
+            for post in self.posts_store.pop_due_posts(cutoff):
+                if await self.enqueue_post(post):
+                    print(f"Queued due post: {post['id']} scheduled for {post['scheduled_time']}")
+                    queued_count += 1
             
-            # Save updated posts (published posts are removed)
-            if len(updated_posts) != len(posts):
-                self.save_posts(updated_posts)
-                print(f"Published {published_count} posts, removed from calendar")
+            if queued_count:
+                print(f"Queued {queued_count} due posts for publishing")
                 
         except Exception as e:
             print(f"Error in scheduler service: {e}")
@@ -100,11 +130,13 @@ class SchedulerService:
     async def start_scheduler(self):
         """Start the background scheduler"""
         self.running = True
+        # Once per process, before any publish starts, so only stale lock files are swept
+        await asyncio.to_thread(self.publishing_agent.sweep_interrupted_publishes)
         print("Scheduler service started - checking every 30 seconds")
         
         while self.running:
             try:
-                self.check_and_publish_due_posts()
+                await self.check_and_publish_due_posts()
                 await asyncio.sleep(30)  # Check every 30 seconds
             except Exception as e:
                 print(f"Scheduler error: {e}")
@@ -113,6 +145,9 @@ class SchedulerService:
     def stop_scheduler(self):
         """Stop the background scheduler"""
         self.running = False
+        for task in self._workers:
+            task.cancel()
+        self._workers = []
         print("Scheduler service stopped")
 
 # Global scheduler instance
@@ -5,6 +5,7 @@ Uses pytrends to fetch current trending topics and generate content recommendati
 
 import os
 import json
+import threading
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import requests
@@ -34,6 +35,9 @@ class TrendsService:
                 self.pytrends = TrendReq(hl='en-US', tz=360)
             except Exception as e:
                 print(f"[WARN] Failed to initialize pytrends: {e}")
+        # The routes call this service from worker threads, and build_payload keeps the query
+        # on the client, so each payload-and-fetch pair runs under this lock
+        self._pytrends_lock = threading.Lock()
     
     def get_trending_topics(self, geo: str = 'US', category: int = 0) -> List[Dict]:
         """Get current trending topics"""
@@ -42,7 +46,8 @@ class TrendsService:
         
         try:
             # Get trending searches
-            trending_searches = self.pytrends.trending_searches(pn='united_states')
+            with self._pytrends_lock:
+                trending_searches = self.pytrends.trending_searches(pn='united_states')
             trends = []
             
             for i, trend in enumerate(trending_searches[0][:10]):  # Top 10 trends
@@ -65,8 +70,9 @@ class TrendsService:
             return {}
         
         try:
-            self.pytrends.build_payload(keywords, cat=0, timeframe='today 7-d', geo='US')
-            interest_data = self.pytrends.interest_over_time()
+            with self._pytrends_lock:
+                self.pytrends.build_payload(keywords, cat=0, timeframe='today 7-d', geo='US')
+                interest_data = self.pytrends.interest_over_time()
             
             if interest_data.empty:
                 return {}
@@ -93,8 +99,9 @@ class TrendsService:
             return {}
         
         try:
-            self.pytrends.build_payload([keyword], cat=0, timeframe='today 7-d', geo='US')
-            related_queries = self.pytrends.related_queries()
+            with self._pytrends_lock:
+                self.pytrends.build_payload([keyword], cat=0, timeframe='today 7-d', geo='US')
+                related_queries = self.pytrends.related_queries()
             
             if keyword not in related_queries or not related_queries[keyword]:
                 return {}
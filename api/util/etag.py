@@ -0,0 +1,35 @@
+"""
+ETag Responses
+JSON responses that let polling clients revalidate with If-None-Match and get an empty 304
+"""
+
+import hashlib
+from typing import Any
+
+import orjson
+from fastapi import Request, Response
+
+DEFAULT_CACHE_CONTROL = "public, max-age=60"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """True if an If-None-Match header lists this ETag (weak comparison, as RFC 9110 requires)"""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def etag_response(request: Request, payload: Any, cache_control: str = DEFAULT_CACHE_CONTROL) -> Response:
+    """
+    Serialize payload once with orjson and tag it with a hash of the bytes. A client that
+    already holds this version gets a bodiless 304 instead of the full payload.
+    """
+    body = orjson.dumps(payload)
+    # BLAKE2b is fast in pure software (no SHA extensions needed); 8 bytes is plenty for an ETag
+    etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
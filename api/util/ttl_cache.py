@@ -0,0 +1,70 @@
+"""
+TTL Cache
+In-process cache for slow async lookups, with concurrent misses for the same key coalesced
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """
+    Keeps each value for `ttl` seconds. While a key is being computed, other callers for the
+    same key await that computation instead of starting their own. Failures are not cached.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.store: Dict[Hashable, Tuple[Any, float]] = {}
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+
+    async def get_or_set(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, or await factory() to compute and store it"""
+        while True:
+            entry = self.store.get(key)
+            if entry is not None and time.monotonic() < entry[1]:
+                return entry[0]
+
+            pending = self._pending.get(key)
+            if pending is None:
+                break
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Re-raise our own cancellation; if the caller computing the value was
+                # cancelled instead, loop round and compute it here
+                if not pending.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            value = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters see the error; mark it retrieved so an unawaited future doesn't log it
+            future.exception()
+            raise
+        else:
+            self._purge_expired()
+            self.store[key] = (value, time.monotonic() + self.ttl)
+            future.set_result(value)
+            return value
+        finally:
+            del self._pending[key]
+
+    def invalidate(self, key: Hashable = None):
+        """Drop one key, or everything when no key is given"""
+        if key is None:
+            self.store.clear()
+        else:
+            self.store.pop(key, None)
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        for key in [key for key, (_, expires) in self.store.items() if expires <= now]:
+            del self.store[key]
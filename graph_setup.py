@@ -3,10 +3,12 @@ AI Social Media Manager - LangGraph Architecture
 Main graph setup file containing the complete workflow and agent connections
 """
 
-from typing import TypedDict, Literal, List, Dict, Any, Optional, Annotated
+from typing import TypedDict, Literal, List, Dict, Any, Optional, Annotated, AsyncIterator, Tuple
 from langgraph.graph import StateGraph, END
+import asyncio
 import operator
 from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.runnables import RunnableLambda
 from datetime import datetime
 import os
 from dotenv import load_dotenv
@@ -24,6 +26,7 @@ from agents.publishing_agent import PublishingAgent
 from agents.analytics_agent import AnalyticsAgent
 from agents.compliance_agent import ComplianceAgent
 from agents.general_agent import GeneralAgent
+from agents.agent_communication import STREAM_SINK, AgentResponse
 from central_router import CentralRouter
 
 # Define the state structure for the graph
@@ -54,7 +57,7 @@ class GraphState(TypedDict):
     human_feedback: Optional[str]
     
     # Results and responses
-    agent_responses: List[Dict[str, Any]]
+    agent_responses: List[AgentResponse]
     final_response: Optional[str]
     
     # Error handling
@@ -118,7 +121,8 @@ class SocialMediaManagerGraph:
         self.workflow.add_node("user_input", self.process_user_input)
         
         # Core agents
-        self.workflow.add_node("strategy", self.strategy_agent.process)
+        # Sync invoke() runs process(); ainvoke() awaits aprocess() and its async Groq call
+        self.workflow.add_node("strategy", RunnableLambda(self.strategy_agent.process, afunc=self.strategy_agent.aprocess))
         self.workflow.add_node("content", self.content_agent.process)
         self.workflow.add_node("publishing", self.publishing_agent.process)
         self.workflow.add_node("analytics", self.analytics_agent.process)
@@ -213,6 +217,7 @@ class SocialMediaManagerGraph:
         state['workflow_step'] = 0
         state['retry_count'] = 0
         state['agent_responses'] = []
+        state.pop('_responded_agents', None)
         
         # Get session memory for context
         session_id = state.get('session_id', f"session_{datetime.now().timestamp()}")
@@ -530,6 +535,50 @@ class SocialMediaManagerGraph:
         """
         Run the graph with a user request
         """
+        initial_state, config = self._build_run(user_request, session_id, context_data)
+        return self.app.invoke(initial_state, config)
+
+    async def run_async(self, user_request: str, session_id: str = None, context_data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Run the graph without blocking the event loop: sync nodes run in worker threads and
+        async-capable nodes (strategy) are awaited directly
+        """
+        initial_state, config = self._build_run(user_request, session_id, context_data)
+        return await self.app.ainvoke(initial_state, config)
+
+    async def run_stream(self, user_request: str, session_id: str = None, context_data: Dict[str, Any] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Run the graph, yielding ("token", text) while streaming agents generate their reply
+        and ("result", final_state) once the run completes
+        """
+        sink = asyncio.Queue()
+        # The run task copies the current context, so agents inside it see this sink
+        reset_token = STREAM_SINK.set(sink)
+        try:
+            run = asyncio.create_task(self.run_async(user_request, session_id, context_data))
+        finally:
+            STREAM_SINK.reset(reset_token)
+
+        try:
+            while not run.done():
+                next_token = asyncio.ensure_future(sink.get())
+                await asyncio.wait({next_token, run}, return_when=asyncio.FIRST_COMPLETED)
+                if next_token.done():
+                    yield "token", next_token.result()
+                else:
+                    next_token.cancel()
+            while not sink.empty():
+                yield "token", sink.get_nowait()
+            yield "result", run.result()
+        finally:
+            # The client went away mid-run
+            if not run.done():
+                run.cancel()
+
+    def _build_run(self, user_request: str, session_id: str = None, context_data: Dict[str, Any] = None):
+        """
+        Build the initial state and config for a graph run
+        """
         thread_id = session_id or f"session_{datetime.now().timestamp()}"
         initial_state = {
             "user_request": user_request,
@@ -551,8 +600,7 @@ class SocialMediaManagerGraph:
 
         # Run the graph with required checkpointer keys and a higher recursion limit
         config = {"configurable": {"thread_id": thread_id}, "recursion_limit": 50}
-        result = self.app.invoke(initial_state, config)
-        return result
+        return initial_state, config
 
 if __name__ == "__main__":
     # Example usage
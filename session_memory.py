@@ -7,6 +7,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import json
 import os
+import threading
 from collections import defaultdict
 
 class SessionMemoryManager:
@@ -26,6 +27,9 @@ class SessionMemoryManager:
         self.memory_store = self._load_memory_from_file() if os.path.exists(persistence_file) else {}
         self.max_memory_items = 100  # Limit memory to prevent excessive growth
         self.max_context_length = 2000  # Max characters per context entry
+        # Graph runs call in from several executor threads; re-entrant because the public
+        # methods call each other
+        self._lock = threading.RLock()
 
     def _load_memory_from_file(self) -> Dict[str, Any]:
         """Load memory from persistence file"""
@@ -38,11 +42,13 @@ class SessionMemoryManager:
 
     def _save_memory_to_file(self):
         """Save memory to persistence file"""
-        try:
-            with open(self.persistence_file, 'w') as f:
-                json.dump(self.memory_store, f, indent=2, default=str)
-        except IOError as e:
-            print(f"Warning: Could not save memory file: {e}")
+        with self._lock:
+            try:
+                with open(self.persistence_file, 'w') as f:
+                    # Compact separators: this file is rewritten on every memory update
+                    json.dump(self.memory_store, f, separators=(',', ':'), default=str)
+            except IOError as e:
+                print(f"Warning: Could not save memory file: {e}")
 
     def get_session_memory(self, session_id: str) -> Dict[str, Any]:
         """
@@ -54,21 +60,22 @@ class SessionMemoryManager:
         Returns:
             Dictionary containing session memory data
         """
-        if session_id not in self.memory_store:
-            self.memory_store[session_id] = {
-                'session_id': session_id,
-                'created_at': datetime.now().isoformat(),
-                'last_updated': datetime.now().isoformat(),
-                'conversation_history': [],
-                'context_summary': {},
-                'agent_interactions': {},
-                'user_preferences': {},
-                'key_topics': [],
-                'important_facts': [],
-                'session_metadata': {}
-            }
-
-        return self.memory_store[session_id]
+        with self._lock:
+            if session_id not in self.memory_store:
+                self.memory_store[session_id] = {
+                    'session_id': session_id,
+                    'created_at': datetime.now().isoformat(),
+                    'last_updated': datetime.now().isoformat(),
+                    'conversation_history': [],
+                    'context_summary': {},
+                    'agent_interactions': {},
+                    'user_preferences': {},
+                    'key_topics': [],
+                    'important_facts': [],
+                    'session_metadata': {}
+                }
+
+            return self.memory_store[session_id]
 
     def update_session_memory(self, session_id: str, updates: Dict[str, Any]):
         """
@@ -78,48 +85,49 @@ class SessionMemoryManager:
             session_id: Unique identifier for the session
             updates: Dictionary of updates to apply to session memory
         """
-        session_memory = self.get_session_memory(session_id)
-
-        # Apply updates
-        for key, value in updates.items():
-            if key == 'conversation_history' and isinstance(value, dict):
-                # Handle new conversation entry
-                session_memory['conversation_history'].append(value)
-            elif key == 'context_summary' and isinstance(value, dict):
-                # Merge context summary
-                session_memory['context_summary'].update(value)
-            elif key in ['agent_interactions', 'user_preferences'] and isinstance(value, dict):
-                # Merge these nested dictionaries
-                session_memory[key].update(value)
-            elif key == 'key_topics' and isinstance(value, list):
-                # Add new topics, avoid duplicates
-                for topic in value:
-                    if topic not in session_memory['key_topics']:
-                        session_memory['key_topics'].append(topic)
-            elif key == 'important_facts' and isinstance(value, list):
-                # Add new facts, avoid duplicates
-                for fact in value:
-                    if fact not in session_memory['important_facts']:
-                        session_memory['important_facts'].append(fact)
-            else:
-                session_memory[key] = value
-
-        # Update timestamp
-        session_memory['last_updated'] = datetime.now().isoformat()
-
-        # Truncate conversation history if too long
-        if len(session_memory['conversation_history']) > self.max_memory_items:
-            session_memory['conversation_history'] = session_memory['conversation_history'][-self.max_memory_items:]
-
-        # Truncate context entries if too long
-        for key in ['context_summary', 'agent_interactions', 'user_preferences']:
-            if isinstance(session_memory.get(key), dict):
-                for sub_key, sub_value in session_memory[key].items():
-                    if isinstance(sub_value, str) and len(sub_value) > self.max_context_length:
-                        session_memory[key][sub_key] = sub_value[:self.max_context_length] + "..."
-
-        # Save to file periodically
-        self._save_memory_to_file()
+        with self._lock:
+            session_memory = self.get_session_memory(session_id)
+
+            # Apply updates
+            for key, value in updates.items():
+                if key == 'conversation_history' and isinstance(value, dict):
+                    # Handle new conversation entry
+                    session_memory['conversation_history'].append(value)
+                elif key == 'context_summary' and isinstance(value, dict):
+                    # Merge context summary
+                    session_memory['context_summary'].update(value)
+                elif key in ['agent_interactions', 'user_preferences'] and isinstance(value, dict):
+                    # Merge these nested dictionaries
+                    session_memory[key].update(value)
+                elif key == 'key_topics' and isinstance(value, list):
+                    # Add new topics, avoid duplicates
+                    for topic in value:
+                        if topic not in session_memory['key_topics']:
+                            session_memory['key_topics'].append(topic)
+                elif key == 'important_facts' and isinstance(value, list):
+                    # Add new facts, avoid duplicates
+                    for fact in value:
+                        if fact not in session_memory['important_facts']:
+                            session_memory['important_facts'].append(fact)
+                else:
+                    session_memory[key] = value
+
+            # Update timestamp
+            session_memory['last_updated'] = datetime.now().isoformat()
+
+            # Truncate conversation history if too long
+            if len(session_memory['conversation_history']) > self.max_memory_items:
+                session_memory['conversation_history'] = session_memory['conversation_history'][-self.max_memory_items:]
+
+            # Truncate context entries if too long
+            for key in ['context_summary', 'agent_interactions', 'user_preferences']:
+                if isinstance(session_memory.get(key), dict):
+                    for sub_key, sub_value in session_memory[key].items():
+                        if isinstance(sub_value, str) and len(sub_value) > self.max_context_length:
+                            session_memory[key][sub_key] = sub_value[:self.max_context_length] + "..."
+
+            # Save to file periodically
+            self._save_memory_to_file()
 
     def add_conversation_entry(self, session_id: str, user_input: str, agent_response: str,
                              agent_name: str, metadata: Dict[str, Any] = None):
@@ -133,24 +141,25 @@ class SessionMemoryManager:
             agent_name: Name of the agent that responded
             metadata: Additional metadata about the interaction
         """
-        entry = {
-            'timestamp': datetime.now().isoformat(),
-            'user_input': user_input,
-            'agent_response': agent_response,
-            'agent_name': agent_name,
-            'metadata': metadata or {}
-        }
-
-        self.update_session_memory(session_id, {
-            'conversation_history': entry
-        })
-
-        # Also update agent interactions
-        agent_key = f"{agent_name}_interactions"
-        current_count = self.memory_store[session_id]['agent_interactions'].get(agent_key, 0)
-        self.update_session_memory(session_id, {
-            'agent_interactions': {agent_key: current_count + 1}
-        })
+        with self._lock:
+            entry = {
+                'timestamp': datetime.now().isoformat(),
+                'user_input': user_input,
+                'agent_response': agent_response,
+                'agent_name': agent_name,
+                'metadata': metadata or {}
+            }
+
+            self.update_session_memory(session_id, {
+                'conversation_history': entry
+            })
+
+            # Also update agent interactions
+            agent_key = f"{agent_name}_interactions"
+            current_count = self.memory_store[session_id]['agent_interactions'].get(agent_key, 0)
+            self.update_session_memory(session_id, {
+                'agent_interactions': {agent_key: current_count + 1}
+            })
 
     def get_conversation_context(self, session_id: str, max_entries: int = 10) -> str:
         """
@@ -163,22 +172,23 @@ class SessionMemoryManager:
         Returns:
             Formatted conversation context string
         """
-        session_memory = self.get_session_memory(session_id)
+        with self._lock:
+            session_memory = self.get_session_memory(session_id)
 
-        if not session_memory['conversation_history']:
-            return "No previous conversation context available."
+            if not session_memory['conversation_history']:
+                return "No previous conversation context available."
 
-        # Get recent entries
-        recent_entries = session_memory['conversation_history'][-max_entries:]
+            # Get recent entries
+            recent_entries = session_memory['conversation_history'][-max_entries:]
 
-        context_parts = ["Recent Conversation Context:"]
-        for i, entry in enumerate(recent_entries, 1):
-            context_parts.append(f"\n{i}. User: {entry['user_input']}")
-            context_parts.append(f"   {entry['agent_name']}: {entry['agent_response'][:200]}...")
-            if entry['metadata']:
-                context_parts.append(f"   Metadata: {entry['metadata']}")
+            context_parts = ["Recent Conversation Context:"]
+            for i, entry in enumerate(recent_entries, 1):
+                context_parts.append(f"\n{i}. User: {entry['user_input']}")
+                context_parts.append(f"   {entry['agent_name']}: {entry['agent_response'][:200]}...")
+                if entry['metadata']:
+                    context_parts.append(f"   Metadata: {entry['metadata']}")
 
-        return "\n".join(context_parts)
+            return "\n".join(context_parts)
 
     def get_agent_context(self, session_id: str, agent_name: str) -> Dict[str, Any]:
         """
@@ -191,28 +201,29 @@ class SessionMemoryManager:
         Returns:
             Dictionary containing agent-specific context
         """
-        session_memory = self.get_session_memory(session_id)
-
-        # Get agent-specific data
-        agent_context = {
-            'session_id': session_id,
-            'conversation_history': session_memory['conversation_history'],
-            'key_topics': session_memory['key_topics'],
-            'important_facts': session_memory['important_facts'],
-            'user_preferences': session_memory['user_preferences'],
-            'previous_agent_responses': []
-        }
-
-        # Add recent agent interactions
-        for entry in session_memory['conversation_history']:
-            if entry['agent_name'] != agent_name:
-                agent_context['previous_agent_responses'].append({
-                    'agent': entry['agent_name'],
-                    'response': entry['agent_response'],
-                    'timestamp': entry['timestamp']
-                })
+        with self._lock:
+            session_memory = self.get_session_memory(session_id)
 
-        return agent_context
+            # Get agent-specific data
+            agent_context = {
+                'session_id': session_id,
+                'conversation_history': session_memory['conversation_history'],
+                'key_topics': session_memory['key_topics'],
+                'important_facts': session_memory['important_facts'],
+                'user_preferences': session_memory['user_preferences'],
+                'previous_agent_responses': []
+            }
+
+            # Add recent agent interactions
+            for entry in session_memory['conversation_history']:
+                if entry['agent_name'] != agent_name:
+                    agent_context['previous_agent_responses'].append({
+                        'agent': entry['agent_name'],
+                        'response': entry['agent_response'],
+                        'timestamp': entry['timestamp']
+                    })
+
+            return agent_context
 
     def extract_key_insights(self, session_id: str) -> Dict[str, Any]:
         """
@@ -224,17 +235,18 @@ class SessionMemoryManager:
         Returns:
             Dictionary containing extracted insights
         """
-        session_memory = self.get_session_memory(session_id)
-
-        insights = {
-            'session_duration': self._calculate_session_duration(session_memory),
-            'most_active_agent': self._get_most_active_agent(session_memory),
-            'conversation_topics': session_memory['key_topics'][:5],  # Top 5 topics
-            'user_engagement_level': self._assess_engagement_level(session_memory),
-            'key_preferences': list(session_memory['user_preferences'].keys())[:3]
-        }
+        with self._lock:
+            session_memory = self.get_session_memory(session_id)
+
+            insights = {
+                'session_duration': self._calculate_session_duration(session_memory),
+                'most_active_agent': self._get_most_active_agent(session_memory),
+                'conversation_topics': session_memory['key_topics'][:5],  # Top 5 topics
+                'user_engagement_level': self._assess_engagement_level(session_memory),
+                'key_preferences': list(session_memory['user_preferences'].keys())[:3]
+            }
 
-        return insights
+            return insights
 
     def _calculate_session_duration(self, session_memory: Dict[str, Any]) -> str:
         """Calculate how long the session has been active"""
@@ -276,9 +288,10 @@ class SessionMemoryManager:
         Args:
             session_id: Unique identifier for the session to clear
         """
-        if session_id in self.memory_store:
-            del self.memory_store[session_id]
-            self._save_memory_to_file()
+        with self._lock:
+            if session_id in self.memory_store:
+                del self.memory_store[session_id]
+                self._save_memory_to_file()
 
     def clear_old_sessions(self, max_age_days: int = 7):
         """
@@ -287,24 +300,25 @@ class SessionMemoryManager:
         Args:
             max_age_days: Maximum age in days for sessions to keep
         """
-        cutoff_date = datetime.now() - timedelta(days=max_age_days)
-        sessions_to_remove = []
-
-        for session_id, session_data in self.memory_store.items():
-            try:
-                created_at = datetime.fromisoformat(session_data['created_at'])
-                if created_at < cutoff_date:
+        with self._lock:
+            cutoff_date = datetime.now() - timedelta(days=max_age_days)
+            sessions_to_remove = []
+
+            for session_id, session_data in self.memory_store.items():
+                try:
+                    created_at = datetime.fromisoformat(session_data['created_at'])
+                    if created_at < cutoff_date:
+                        sessions_to_remove.append(session_id)
+                except (ValueError, KeyError):
+                    # Remove sessions with invalid timestamps
                     sessions_to_remove.append(session_id)
-            except (ValueError, KeyError):
-                # Remove sessions with invalid timestamps
-                sessions_to_remove.append(session_id)
 
-        for session_id in sessions_to_remove:
-            del self.memory_store[session_id]
+            for session_id in sessions_to_remove:
+                del self.memory_store[session_id]
 
-        if sessions_to_remove:
-            self._save_memory_to_file()
-            print(f"Cleared {len(sessions_to_remove)} old sessions")
+            if sessions_to_remove:
+                self._save_memory_to_file()
+                print(f"Cleared {len(sessions_to_remove)} old sessions")
 
     def get_session_summary(self, session_id: str) -> str:
         """
@@ -316,10 +330,11 @@ class SessionMemoryManager:
         Returns:
             Formatted summary string
         """
-        session_memory = self.get_session_memory(session_id)
-        insights = self.extract_key_insights(session_id)
+        with self._lock:
+            session_memory = self.get_session_memory(session_id)
+            insights = self.extract_key_insights(session_id)
 
-        summary = f"""
+            summary = f"""
 Session Summary ({session_id}):
 - Duration: {insights['session_duration']}
 - Most Active Agent: {insights['most_active_agent']}